@@ -56,6 +56,7 @@ train_pipeline = [
                     [dict(
                         type=LoadMask,
                         mask_mode="bbox",
+                        defer_bbox_mask=True,
                         mask_config=dict(
                             max_bbox_shape=(150, 150),
                             max_bbox_delta=50,
@@ -63,6 +64,7 @@ train_pipeline = [
                     [dict(
                         type=LoadMask,
                         mask_mode="bbox",
+                        defer_bbox_mask=True,
                         mask_config=dict(
                             max_bbox_shape=(300, 300),
                             max_bbox_delta=100,
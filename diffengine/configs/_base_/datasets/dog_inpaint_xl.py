@@ -27,6 +27,7 @@ train_pipeline = [
     dict(
         type=LoadMask,
         mask_mode="bbox",
+        defer_bbox_mask=True,
         mask_config=dict(
             max_bbox_shape=(512, 512),
             max_bbox_delta=80,
@@ -3,8 +3,7 @@ from mmengine.dataset import InfiniteSampler
 
 from diffengine.datasets import HFDreamBoothDataset
 from diffengine.datasets.transforms import (
-    ComputeTimeIds,
-    DumpImage,
+    FusedToTensorNormalize,
     PackInputs,
     RandomCrop,
     RandomHorizontalFlip,
@@ -20,17 +19,17 @@ train_pipeline = [
          size=1024, interpolation="bilinear"),
     dict(type=RandomCrop, size=1024),
     dict(type=RandomHorizontalFlip, p=0.5),
-    dict(type=ComputeTimeIds),
-    dict(type=TorchVisonTransformWrapper,
-         transform=torchvision.transforms.ToTensor),
-    dict(type=DumpImage, max_imgs=10, dump_dir="work_dirs/dump"),
-    dict(type=TorchVisonTransformWrapper,
-         transform=torchvision.transforms.Normalize, mean=[0.5], std=[0.5]),
-    dict(type=PackInputs, input_keys=["img", "text", "time_ids"]),
+    dict(type=FusedToTensorNormalize, dtype="bfloat16"),
+    # time ids are computed per batch by SDXLDataPreprocessor
+    dict(type=PackInputs,
+         input_keys=["img", "text", "ori_img_shape", "crop_top_left"]),
 ]
 train_dataloader = dict(
     batch_size=2,
     num_workers=4,
+    persistent_workers=True,
+    prefetch_factor=4,
+    pin_memory=True,
     dataset=dict(
         type=HFDreamBoothDataset,
         dataset="google/dreambooth",
@@ -3,7 +3,8 @@ from mmengine.dataset import DefaultSampler
 
 from diffengine.datasets import HFDataset
 from diffengine.datasets.transforms import (
-    ComputeTimeIds,
+    ClampLongestSide,
+    FusedToTensorNormalize,
     PackInputs,
     RandomCrop,
     RandomHorizontalFlip,
@@ -14,21 +15,23 @@ from diffengine.engine.hooks import SDCheckpointHook, VisualizationHook
 
 train_pipeline = [
     dict(type=SaveImageShape),
+    dict(type=ClampLongestSide, max_size=2048),
     dict(type=TorchVisonTransformWrapper,
          transform=torchvision.transforms.Resize,
          size=1024, interpolation="bilinear"),
     dict(type=RandomCrop, size=1024),
     dict(type=RandomHorizontalFlip, p=0.5),
-    dict(type=ComputeTimeIds),
-    dict(type=TorchVisonTransformWrapper,
-         transform=torchvision.transforms.ToTensor),
-    dict(type=TorchVisonTransformWrapper,
-         transform=torchvision.transforms.Normalize, mean=[0.5], std=[0.5]),
-    dict(type=PackInputs, input_keys=["img", "text", "time_ids"]),
+    dict(type=FusedToTensorNormalize, dtype="bfloat16"),
+    # time ids are computed per batch by SDXLDataPreprocessor
+    dict(type=PackInputs,
+         input_keys=["img", "text", "ori_img_shape", "crop_top_left"]),
 ]
 train_dataloader = dict(
     batch_size=2,
     num_workers=2,
+    persistent_workers=True,
+    prefetch_factor=4,
+    pin_memory=True,
     dataset=dict(
         type=HFDataset,
         dataset="lambdalabs/pokemon-blip-captions",
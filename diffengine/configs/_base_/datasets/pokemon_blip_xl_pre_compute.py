@@ -40,6 +40,7 @@ train_dataloader = dict(
         dataset="lambdalabs/pokemon-blip-captions",
         text_hasher="text_pokemon_blip",
         model="stabilityai/stable-diffusion-xl-base-1.0",
+        embed_cache_dir="work_dirs/cache",
         pipeline=train_pipeline),
     sampler=dict(type=DefaultSampler, shuffle=True),
 )
@@ -120,14 +120,22 @@ class HFDatasetPreComputeEmbs(HFDataset):
         device (str): Device used to compute embeddings. Defaults to 'cuda'.
         proportion_empty_prompts (float): The probabilities to replace empty
             text. Defaults to 0.9.
+        embed_cache_dir (str, optional): If set, the pre-computed embeddings
+            are written once to ``.npy`` files under
+            ``{embed_cache_dir}/{dataset fingerprint}`` and memory-mapped, so
+            that ``__getitem__`` returns tensor views instead of converting
+            nested lists for every sample. Defaults to None.
     """
 
+    embed_keys = ("prompt_embeds", "pooled_prompt_embeds")
+
     def __init__(self,
                  *args,
                  model: str = "stabilityai/stable-diffusion-xl-base-1.0",
                  text_hasher: str = "text",
                  device: str = "cuda",
                  proportion_empty_prompts: float = 0.0,
+                 embed_cache_dir: str | None = None,
                  **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
@@ -159,6 +167,39 @@ class HFDatasetPreComputeEmbs(HFDataset):
         gc.collect()
         torch.cuda.empty_cache()
 
+        self.embs: dict[str, np.ndarray] = {}
+        if embed_cache_dir is not None:
+            self.embs = self._build_embed_cache(embed_cache_dir)
+            # avoid decoding the embedding columns in ``__getitem__``
+            self.dataset = self.dataset.remove_columns(list(self.embed_keys))
+
+    def _build_embed_cache(self,
+                           embed_cache_dir: str) -> dict[str, np.ndarray]:
+        """Write the embeddings to ``.npy`` files once and memory-map them."""
+        fingerprint = self.dataset._fingerprint  # noqa: SLF001
+        cache_dir = Path(embed_cache_dir) / fingerprint
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for key in self.embed_keys:
+            path = cache_dir / f"{key}.npy"
+            if path.exists():
+                continue
+            column = self.dataset.with_format("numpy", columns=[key])
+            shape = (len(column), *column[0][key].shape)
+            tmp_path = cache_dir / f"{key}.{os.getpid()}.tmp.npy"
+            out = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=np.float32, shape=shape)
+            for i in range(0, len(column), 1024):
+                out[i:i + 1024] = column[i:i + 1024][key]
+            out.flush()
+            del out
+            # other ranks may build the same cache concurrently
+            tmp_path.replace(path)
+        # copy-on-write keeps the rows writable for ``torch.from_numpy``
+        return {
+            key: np.load(cache_dir / f"{key}.npy", mmap_mode="c")
+            for key in self.embed_keys
+        }
+
     def __getitem__(self, idx: int) -> dict:
         """Get item.
 
@@ -179,9 +220,12 @@ class HFDatasetPreComputeEmbs(HFDataset):
         if isinstance(image, str):
             image = Image.open(os.path.join(self.dataset_name, image))
         image = image.convert("RGB")
-        result = {
-            "img": image,
-            "prompt_embeds": data_info["prompt_embeds"],
-            "pooled_prompt_embeds": data_info["pooled_prompt_embeds"],
-        }
+        result = {"img": image}
+        if self.embs:
+            result.update({
+                key: torch.from_numpy(emb[idx])
+                for key, emb in self.embs.items()
+            })
+        else:
+            result.update({key: data_info[key] for key in self.embed_keys})
         return self.pipeline(result)
@@ -6,11 +6,13 @@ from .processing import (
     TRANSFORMS,
     AddConstantCaption,
     CenterCrop,
+    ClampLongestSide,
     CLIPImageProcessor,
     ComputeaMUSEdMicroConds,
     ComputePixArtImgInfo,
     ComputeTimeIds,
     ConcatMultipleImgs,
+    FusedToTensorNormalize,
     GetMaskedImage,
     MaskToTensor,
     MultiAspectRatioResizeCenterCrop,
@@ -30,6 +32,7 @@ __all__ = [
     "PackInputs",
     "TRANSFORMS",
     "SaveImageShape",
+    "ClampLongestSide",
     "RandomCrop",
     "CenterCrop",
     "RandomHorizontalFlip",
@@ -51,4 +54,5 @@ __all__ = [
     "ComputeaMUSEdMicroConds",
     "TransformersImageProcessor",
     "TimmImageProcessor",
+    "FusedToTensorNormalize",
 ]
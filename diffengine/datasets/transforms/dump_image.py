@@ -1,4 +1,6 @@
 import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
 from os import path as osp
 
 import cv2
@@ -8,11 +10,30 @@ from torch.multiprocessing import Value
 
 from diffengine.registry import TRANSFORMS
 
+_dump_executor: dict[int, ThreadPoolExecutor] = {}
+
+
+def _imwrite_async(out_file: str, img: np.ndarray) -> None:
+    """Write the image in a background thread of the current process.
+
+    The executor is created lazily per process because threads do not
+    survive the fork of DataLoader workers. Pending writes are flushed when
+    the process exits.
+    """
+    pid = os.getpid()
+    if pid not in _dump_executor:
+        _dump_executor[pid] = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="dump")
+    _dump_executor[pid].submit(cv2.imwrite, out_file, img)
+
 
 @TRANSFORMS.register_module()
 class DumpImage:
     """Dump the image processed by the pipeline.
 
+    Images are written by a background thread so that the DataLoader worker
+    is not blocked by disk I/O.
+
     Args:
     ----
         max_imgs (int): Maximum value of output.
@@ -39,6 +60,9 @@ class DumpImage:
         -------
             results (dict): Result dict from loading pipeline. (same as input)
         """
+        if self.num_dumped_imgs.value >= self.max_imgs:
+            return results
+
         enable_dump = False
         with self.num_dumped_imgs.get_lock():
             if self.num_dumped_imgs.value < self.max_imgs:
@@ -51,23 +75,23 @@ class DumpImage:
             if img.shape[0] in [1, 3]:
                 img = img.permute(1, 2, 0) * 255
             out_file = osp.join(self.dump_dir, f"{dump_id}_image.png")
-            cv2.imwrite(out_file, img.numpy().astype(np.uint8)[..., ::-1])
+            _imwrite_async(out_file, img.numpy().astype(np.uint8)[..., ::-1])
 
             if "condition_img" in results:
                 condition_img = results["condition_img"]
                 if condition_img.shape[0] in [1, 3]:
                     condition_img = condition_img.permute(1, 2, 0) * 255
                 cond_out_file = osp.join(self.dump_dir, f"{dump_id}_cond.png")
-                cv2.imwrite(cond_out_file,
-                            condition_img.numpy().astype(np.uint8)[..., ::-1])
+                _imwrite_async(
+                    cond_out_file,
+                    condition_img.numpy().astype(np.uint8)[..., ::-1])
 
             if "mask" in results:
                 mask = results["mask"]
                 if mask.shape[0] in [1, 3]:
                     mask = mask.permute(1, 2, 0) * 255
                 mask_out_file = osp.join(self.dump_dir, f"{dump_id}_mask.png")
-                cv2.imwrite(mask_out_file,
-                            mask.numpy().astype(np.uint8))
+                _imwrite_async(mask_out_file, mask.numpy().astype(np.uint8))
 
         return results
 
@@ -76,6 +100,9 @@ class DumpImage:
 class DumpMaskedImage:
     """Dump Masked the image processed by the pipeline.
 
+    Images are written by a background thread so that the DataLoader worker
+    is not blocked by disk I/O.
+
     Args:
     ----
         max_imgs (int): Maximum value of output.
@@ -102,6 +129,9 @@ class DumpMaskedImage:
         -------
             results (dict): Result dict from loading pipeline. (same as input)
         """
+        if self.num_dumped_imgs.value >= self.max_imgs:
+            return results
+
         enable_dump = False
         with self.num_dumped_imgs.get_lock():
             if self.num_dumped_imgs.value < self.max_imgs:
@@ -116,7 +146,7 @@ class DumpMaskedImage:
                 masked_image = masked_image.permute(1, 2, 0) * 255
             masked_image_out_file = osp.join(
                 self.dump_dir, f"{dump_id}_masked_image.png")
-            cv2.imwrite(masked_image_out_file,
-                        masked_image.numpy().astype(np.uint8)[..., ::-1])
+            _imwrite_async(masked_image_out_file,
+                           masked_image.numpy().astype(np.uint8)[..., ::-1])
 
         return results
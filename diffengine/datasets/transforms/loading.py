@@ -1,16 +1,38 @@
-# flake8: noqa: NPY002,ANN201,D417
+# flake8: noqa: ANN201,D417
 # Copyright (c) OpenMMLab. All rights reserved.
 
 import math
+import os
 
 import cv2
 import numpy as np
+import torch
 from mmengine.utils import is_tuple_of
-from PIL import Image, ImageDraw
 
 from diffengine.datasets.transforms.base import BaseTransform
 from diffengine.registry import TRANSFORMS
 
+_rng_state: dict = {}
+# number of values of a (min, max) range
+_RANGE_LEN = 2
+
+
+def _rng() -> np.random.Generator:
+    """Get the numpy random generator of the current process.
+
+    The generator is created lazily in each process and seeded with
+    ``torch.initial_seed()``, so that ``randomness.seed`` keeps the masks
+    reproducible. In DataLoader workers this is the seed set by mmengine's
+    ``worker_init_fn``, which differs across ranks, or torch's per-worker seed
+    otherwise.
+    """
+    seed = torch.initial_seed()
+    key = (os.getpid(), seed)
+    if _rng_state.get("key") != key:
+        _rng_state["key"] = key
+        _rng_state["rng"] = np.random.default_rng(seed)
+    return _rng_state["rng"]
+
 
 def random_bbox(img_shape: tuple[int, int],
                 max_bbox_shape: int | tuple[int, int],
@@ -23,8 +45,8 @@ def random_bbox(img_shape: tuple[int, int],
     https://github.com/open-mmlab/mmagic/blob/main/mmagic/utils/trans_utils.py
 
     In our implementation, the max value cannot be obtained since we use
-    `np.random.randint`. And this may be different with other standard scripts
-    in the community.
+    `np.random.Generator.integers`. And this may be different with other
+    standard scripts in the community.
 
     Args:
     ----
@@ -79,12 +101,13 @@ def random_bbox(img_shape: tuple[int, int],
     max_top = img_h - margin_h - max_mask_h
     max_left = img_w - margin_w - max_mask_w
     # randomly select a (top, left)
-    top = np.random.randint(margin_h, max_top)
-    left = np.random.randint(margin_w, max_left)
+    rng = _rng()
+    top = int(rng.integers(margin_h, max_top))
+    left = int(rng.integers(margin_w, max_left))
     # randomly shrink the shape of mask box according to `max_bbox_delta`
     # the center of box is fixed
-    delta_top = np.random.randint(0, max_delta_h // 2 + 1)
-    delta_left = np.random.randint(0, max_delta_w // 2 + 1)
+    delta_top = int(rng.integers(0, max_delta_h // 2 + 1))
+    delta_left = int(rng.integers(0, max_delta_w // 2 + 1))
     top = top + delta_top
     left = left + delta_left
     h = max_mask_h - delta_top
@@ -118,18 +141,137 @@ def bbox2mask(img_shape: tuple[int, int],
         mask (np.ndarray): Mask in the shape of (h, w, 1).
     """
     height, width = img_shape[:2]
+    top, left, h, w = bbox
+
+    if h * w > height * width / 2:
+        # fill the larger region on allocation and clear the complement
+        mask = np.ones((height, width), dtype=dtype)
+        mask[:top] = 0
+        mask[top + h:] = 0
+        mask[top:top + h, :left] = 0
+        mask[top:top + h, left + w:] = 0
+    else:
+        mask = np.zeros((height, width), dtype=dtype)
+        mask[top:top + h, left:left + w] = 1
+
+    return mask.reshape(height, width, 1)
+
+
+def _to_range(value: int | tuple[int, int], name: str) -> tuple[int, int]:
+    """Convert an int or (min, max) tuple to a (min, max) range.
+
+    If only an integer is given, the range is fixed to that value.
+    """
+    if isinstance(value, int):
+        return value, value + 1
+    if is_tuple_of(value, int) and len(value) == _RANGE_LEN:
+        return value
+    msg = (f"The type of {name} should be intor tuple[int], but"
+           f" got type: {value}")
+    raise TypeError(msg)
+
+
+def _normalize_mask_config(mask_config: dict) -> dict:
+    """Convert the int or tuple ranges of ``mask_config`` to (min, max).
+
+    The mask generators assume the (min, max) form, so that the config is
+    parsed once instead of for every sample.
+    """
+    mask_config = dict(mask_config)
+    for name in ("num_vertices", "length_range", "brush_width"):
+        if name in mask_config:
+            mask_config[name] = _to_range(mask_config[name], name)
+    return mask_config
+
+
+def _sample_irregular_strokes(img_shape: tuple[int, int],
+                              stroke_ids: np.ndarray,
+                              max_angle: float,
+                              length_range: tuple[int, int],
+                              brush_width: tuple[int, int],
+                              ) -> tuple[np.ndarray, ...]:
+    """Sample the segments of irregular strokes.
+
+    Args:
+    ----
+        img_shape (tuple[int]): Size of the image.
+        stroke_ids (np.ndarray): Index of each stroke. Strokes with an even
+            index are drawn with the reversed angle.
+        max_angle (float): Max value of angle at each vertex.
+        length_range (tuple[int]): (min_length, max_length).
+        brush_width (tuple[int]): (min_width, max_width).
 
-    mask = np.zeros((height, width, 1), dtype=dtype)
-    mask[bbox[0]:bbox[0] + bbox[2], bbox[1]:bbox[1] + bbox[3], :] = 1
+    Returns:
+    -------
+        tuple[np.ndarray]: The segments in the shape of (n, 2, 2) as cv2
+            points, the brush width of each segment and the number of
+            segments of each stroke.
+    """
+    h, w = img_shape[:2]
+    num_v = len(stroke_ids)
+    rng = _rng()
+    # from each start point, randomly select n \in [1, 6] directions.
+    direction_nums = rng.integers(1, 6, size=num_v)
+    num_segments = int(direction_nums.sum())
+    start_x = rng.integers(w, size=num_v)
+    start_y = rng.integers(h, size=num_v)
+    angle_list = rng.integers(0, max_angle, size=num_segments)
+    length_list = rng.integers(*length_range, size=num_segments)
+    brush_width_list = rng.integers(*brush_width, size=num_segments)
+
+    # walk all strokes at once: the end point of each segment is the start
+    # point of its stroke plus the cumulative sum of the preceding steps.
+    angles = 0.01 + angle_list
+    angles = np.where(
+        np.repeat(stroke_ids, direction_nums) % 2 == 0,
+        2 * math.pi - angles, angles)
+    delta_x = (length_list * np.sin(angles)).astype(np.int32)
+    delta_y = (length_list * np.cos(angles)).astype(np.int32)
+    first_ids = np.cumsum(direction_nums) - direction_nums
+    cum_x = np.cumsum(delta_x)
+    cum_y = np.cumsum(delta_y)
+    end_x = np.repeat(start_x - cum_x[first_ids] + delta_x[first_ids],
+                      direction_nums) + cum_x
+    end_y = np.repeat(start_y - cum_y[first_ids] + delta_y[first_ids],
+                      direction_nums) + cum_y
+    # cv2 points are given as (start_y, start_x) like the original mmagic
+    # implementation.
+    segments = np.stack([
+        np.stack([end_y - delta_y, end_x - delta_x], axis=-1),
+        np.stack([end_y, end_x], axis=-1),
+    ], axis=1).astype(np.int32)
+    return segments, brush_width_list, direction_nums
+
+
+def _draw_irregular_strokes(mask: np.ndarray,
+                            stroke_ids: np.ndarray,
+                            max_angle: float,
+                            length_range: tuple[int, int],
+                            brush_width: tuple[int, int]) -> None:
+    """Draw irregular strokes into ``mask`` in place.
 
-    return mask
+    Args:
+    ----
+        mask (np.ndarray): Mask in the shape of (h, w) to draw on.
+        stroke_ids (np.ndarray): Index of each stroke. Strokes with an even
+            index are drawn with the reversed angle.
+        max_angle (float): Max value of angle at each vertex.
+        length_range (tuple[int]): (min_length, max_length).
+        brush_width (tuple[int]): (min_width, max_width).
+    """
+    segments, brush_width_list, _ = _sample_irregular_strokes(
+        mask.shape, stroke_ids, max_angle, length_range, brush_width)
+    # draw every segment sharing the same brush width in a single call
+    for brush_w in np.unique(brush_width_list):
+        cv2.polylines(mask, list(segments[brush_width_list == brush_w]),
+                      isClosed=False, color=1, thickness=int(brush_w))
 
 
 def random_irregular_mask(img_shape: tuple[int, int],
-                          num_vertices: int | tuple[int, int] = (4, 8),
+                          num_vertices: tuple[int, int] = (4, 8),
                           max_angle: float = 4,
-                          length_range: int | tuple[int, int] = (10, 100),
-                          brush_width: int | tuple[int, int] = (10, 40),
+                          length_range: tuple[int, int] = (10, 100),
+                          brush_width: tuple[int, int] = (10, 40),
                           dtype: str = "uint8") -> np.ndarray:
     """Generate random irregular masks.
 
@@ -145,14 +287,12 @@ def random_irregular_mask(img_shape: tuple[int, int],
     Args:
     ----
         img_shape (tuple[int]): Size of the image.
-        num_vertices (int | tuple[int]): Min and max number of vertices. If
-            only give an integer, we will fix the number of vertices.
+        num_vertices (tuple[int]): Min and max number of vertices.
             Default: (4, 8).
         max_angle (float): Max value of angle at each vertex. Default 4.0.
-        length_range (int | tuple[int]): (min_length, max_length). If only give
-            an integer, we will fix the length of brush. Default: (10, 100).
-        brush_width (int | tuple[int]): (min_width, max_width). If only give
-            an integer, we will fix the width of brush. Default: (10, 40).
+        length_range (tuple[int]): (min_length, max_length).
+            Default: (10, 100).
+        brush_width (tuple[int]): (min_width, max_width). Default: (10, 40).
         np.dtype (str): Indicate the data type of returned masks.
             Default: 'uint8'
 
@@ -163,93 +303,107 @@ def random_irregular_mask(img_shape: tuple[int, int],
     h, w = img_shape[:2]
 
     mask = np.zeros((h, w), dtype=dtype)
-    if isinstance(length_range, int):
-        min_length, max_length = length_range, length_range + 1
-    elif isinstance(length_range, tuple):
-        min_length, max_length = length_range
-    else:
-        msg = (f"The type of length_range should be intor tuple[int], but"
-               f" got type: {length_range}")
-        raise TypeError(msg)
-    if isinstance(num_vertices, int):
-        min_num_vertices, max_num_vertices = num_vertices, num_vertices + 1
-    elif isinstance(num_vertices, tuple):
-        min_num_vertices, max_num_vertices = num_vertices
-    else:
-        msg = (f"The type of num_vertices should be intor tuple[int], but"
-               f" got type: {num_vertices}")
-        raise TypeError(msg)
-
-    if isinstance(brush_width, int):
-        min_brush_width, max_brush_width = brush_width, brush_width + 1
-    elif isinstance(brush_width, tuple):
-        min_brush_width, max_brush_width = brush_width
-    else:
-        msg = (f"The type of brush_width should be intor tuple[int], "
-               f"but got type: {brush_width}")
-        raise TypeError(msg)
-
-    num_v = np.random.randint(min_num_vertices, max_num_vertices)
-
-    for i in range(num_v):
-        start_x = np.random.randint(w)
-        start_y = np.random.randint(h)
-        # from the start point, randomly setlect n \in [1, 6] directions.
-        direction_num = np.random.randint(1, 6)
-        angle_list = np.random.randint(0, max_angle, size=direction_num)
-        length_list = np.random.randint(
-            min_length, max_length, size=direction_num)
-        brush_width_list = np.random.randint(
-            min_brush_width, max_brush_width, size=direction_num)
-        for direct_n in range(direction_num):
-            angle = 0.01 + angle_list[direct_n]
-            if i % 2 == 0:
-                angle = 2 * math.pi - angle
-            length = length_list[direct_n]
-            brush_w = brush_width_list[direct_n]
-            # compute end point according to the random angle
-            end_x = (start_x + length * np.sin(angle)).astype(np.int32)
-            end_y = (start_y + length * np.cos(angle)).astype(np.int32)
-
-            cv2.line(mask, (start_y, start_x), (end_y, end_x), 1, brush_w)
-            start_x, start_y = end_x, end_y
+    num_v = _rng().integers(*num_vertices)
+    _draw_irregular_strokes(mask, np.arange(num_v), max_angle, length_range,
+                            brush_width)
     return np.expand_dims(mask, axis=2)
 
 
-
 def get_irregular_mask(img_shape: tuple[int, int],
                        area_ratio_range: tuple[float, float] = (0.15, 0.5),
-                       **kwargs) -> np.ndarray:
+                       num_vertices: tuple[int, int] = (4, 8),
+                       max_angle: float = 4,
+                       length_range: tuple[int, int] = (10, 100),
+                       brush_width: tuple[int, int] = (10, 40),
+                       dtype: str = "uint8") -> np.ndarray:
     """Get irregular mask with the constraints in mask ratio.
 
     Copied from
     https://github.com/open-mmlab/mmagic/blob/main/mmagic/utils/trans_utils.py
 
+    Instead of regenerating the whole mask until its area ratio falls in
+    ``area_ratio_range``, a target ratio is sampled from the range and
+    strokes are added one by one until the target is reached. Strokes that
+    would push the ratio over the maximum are discarded. The strokes are
+    sampled in rounds of ``num_vertices`` strokes.
+
     Args:
     ----
         img_shape (tuple[int]): Size of the image.
         area_ratio_range (tuple(float)): Contain the minimum and maximum area
-        ratio. Default: (0.15, 0.5).
+            ratio. Default: (0.15, 0.5).
+        num_vertices (tuple[int]): Min and max number of strokes sampled in
+            each round. The total number of strokes is decided by the target
+            area ratio. Default: (4, 8).
+        max_angle (float): Max value of angle at each vertex. Default 4.0.
+        length_range (tuple[int]): (min_length, max_length).
+            Default: (10, 100).
+        brush_width (tuple[int]): (min_width, max_width). Default: (10, 40).
+        np.dtype (str): Indicate the data type of returned masks.
+            Default: 'uint8'
 
     Returns:
     -------
         mask (np.ndarray): Mask in the shape of (h, w, 1).
     """
-    mask = random_irregular_mask(img_shape, **kwargs)
     min_ratio, max_ratio = area_ratio_range
+    h, w = img_shape[:2]
+    min_area = min_ratio * h * w
+    max_area = max_ratio * h * w
+    target_area = _rng().uniform(min_ratio, max_ratio) * h * w
 
-    while not min_ratio < (np.sum(mask) /
-                           (img_shape[0] * img_shape[1])) < max_ratio:
-        mask = random_irregular_mask(img_shape, **kwargs)
+    mask = np.zeros((h, w), dtype=dtype)
+    area = 0
+    stroke_id = 0
+    while area <= min_area or area < target_area:
+        # strokes are sampled in rounds to amortize the sampling overhead
+        num_strokes = int(_rng().integers(*num_vertices))
+        segments, brush_width_list, direction_nums = (
+            _sample_irregular_strokes(
+                (h, w), np.arange(stroke_id, stroke_id + num_strokes),
+                max_angle, length_range, brush_width))
+        stroke_id += num_strokes
+        # the bounding box of each stroke padded by its brush width
+        ends = np.cumsum(direction_nums)
+        starts = ends - direction_nums
+        pad = np.maximum.reduceat(brush_width_list, starts)
+        xs, ys = segments[..., 0], segments[..., 1]
+        lefts = np.clip(np.minimum.reduceat(xs.min(1), starts) - pad, 0, w)
+        rights = np.clip(
+            np.maximum.reduceat(xs.max(1), starts) + pad + 1, 0, w)
+        tops = np.clip(np.minimum.reduceat(ys.min(1), starts) - pad, 0, h)
+        bottoms = np.clip(
+            np.maximum.reduceat(ys.max(1), starts) + pad + 1, 0, h)
+        for start, end, top, bottom, left, right in zip(
+                starts.tolist(), ends.tolist(), tops.tolist(),
+                bottoms.tolist(), lefts.tolist(), rights.tolist(),
+                strict=True):
+            # only the bounding box can change, so it is saved before
+            # drawing in place and restored if the stroke is rejected
+            roi = mask[top:bottom, left:right]
+            saved_roi = roi.copy()
+            for pts, brush_w in zip(segments[start:end],
+                                    brush_width_list[start:end].tolist(),
+                                    strict=True):
+                cv2.polylines(mask, [pts], isClosed=False, color=1,
+                              thickness=brush_w)
+            candidate_area = area + np.count_nonzero(
+                roi) - np.count_nonzero(saved_roi)
+            if candidate_area < max_area:
+                area = candidate_area
+                if area > min_area and area >= target_area:
+                    break
+            else:
+                roi[...] = saved_roi
 
-    return mask
+    return np.expand_dims(mask, axis=2)
 
 
 def brush_stroke_mask(img_shape: tuple[int, int],
-                      num_vertices: int | tuple[int, int] = (4, 12),
+                      num_vertices: tuple[int, int] = (4, 12),
                       mean_angle: float = 2 * math.pi / 5,
                       angle_range: float = 2 * math.pi / 15,
-                      brush_width: int | tuple[int, int] = (12, 40),
+                      brush_width: tuple[int, int] = (12, 40),
                       max_loops: int = 4,
                       dtype: str = "uint8") -> np.ndarray:
     """Generate free-form mask.
@@ -261,7 +415,7 @@ def brush_stroke_mask(img_shape: tuple[int, int],
     Free-Form Image Inpainting with Gated Convolution.
 
     When you set the config of this type of mask. You may note the usage of
-    `np.random.randint` and the range of `np.random.randint` is [left, right).
+    `np.random.Generator.integers` and its range is [left, right).
 
     We prefer to use `uint8` as the data type of masks, which may be different
     from other codes in the community.
@@ -269,15 +423,13 @@ def brush_stroke_mask(img_shape: tuple[int, int],
     Args:
     ----
         img_shape (tuple[int]): Size of the image.
-        num_vertices (int | tuple[int]): Min and max number of vertices. If
-            only give an integer, we will fix the number of vertices.
+        num_vertices (tuple[int]): Min and max number of vertices.
             Default: (4, 12).
         mean_angle (float): Mean value of the angle in each vertex. The angle
             is measured in radians. Default: 2 * math.pi / 5.
         angle_range (float): Range of the random angle.
             Default: 2 * math.pi / 15.
-        brush_width (int | tuple[int]): (min_width, max_width). If only give
-            an integer, we will fix the width of brush. Default: (12, 40).
+        brush_width (tuple[int]): (min_width, max_width). Default: (12, 40).
         max_loops (int): The max number of for loops of drawing strokes.
             Default: 4.
         np.dtype (str): Indicate the data type of returned masks.
@@ -288,70 +440,63 @@ def brush_stroke_mask(img_shape: tuple[int, int],
         mask (np.ndarray): Mask in the shape of (h, w, 1).
     """
     img_h, img_w = img_shape[:2]
-    if isinstance(num_vertices, int):
-        min_num_vertices, max_num_vertices = num_vertices, num_vertices + 1
-    elif isinstance(num_vertices, tuple):
-        min_num_vertices, max_num_vertices = num_vertices
-    else:
-        msg = (f"The type of num_vertices should be intor tuple[int], but"
-               f" got type: {num_vertices}")
-        raise TypeError(msg)
-
-    if isinstance(brush_width, tuple):
-        min_width, max_width = brush_width
-    elif isinstance(brush_width, int):
-        min_width, max_width = brush_width, brush_width + 1
-    else:
-        msg = (f"The type of brush_width should be intor tuple[int], but"
-               f" got type: {brush_width}")
-        raise TypeError(msg)
+    min_num_vertices, max_num_vertices = num_vertices
+    min_width, max_width = brush_width
 
     average_radius = math.sqrt(img_h * img_h + img_w * img_w) / 8
-    mask = Image.new("L", (img_w, img_h), 0)
+    mask = np.zeros((img_h, img_w), dtype=dtype)
 
-    loop_num = np.random.randint(1, max_loops)
-    num_vertex_list = np.random.randint(
+    rng = _rng()
+    loop_num = rng.integers(1, max_loops)
+    num_vertex_list = rng.integers(
         min_num_vertices, max_num_vertices, size=loop_num)
-    angle_min_list = np.random.uniform(0, angle_range, size=loop_num)
-    angle_max_list = np.random.uniform(0, angle_range, size=loop_num)
+    angle_min_list = rng.uniform(0, angle_range, size=loop_num)
+    angle_max_list = rng.uniform(0, angle_range, size=loop_num)
+    start_list = rng.integers((0, 0), (img_w, img_h), size=(loop_num, 2))
+    width_list = rng.integers(min_width, max_width, size=loop_num)
 
     for loop_n in range(loop_num):
         num_vertex = num_vertex_list[loop_n]
         angle_min = mean_angle - angle_min_list[loop_n]
         angle_max = mean_angle + angle_max_list[loop_n]
-        angles = []
-        vertex = []
 
         # set random angle on each vertex
-        angles = np.random.uniform(angle_min, angle_max, size=num_vertex)
+        angles = rng.uniform(angle_min, angle_max, size=num_vertex)
         reverse_mask = (np.arange(num_vertex, dtype=np.float32) % 2) == 0
         angles[reverse_mask] = 2 * math.pi - angles[reverse_mask]
 
-        h, w = mask.size
-
         # set random vertices
-        vertex.append((np.random.randint(0, w), np.random.randint(0, h)))
-        r_list = np.random.normal(
-            loc=average_radius, scale=average_radius // 2, size=num_vertex)
-        for i in range(num_vertex):
-            r = np.clip(r_list[i], 0, 2 * average_radius)
-            new_x = np.clip(vertex[-1][0] + r * math.cos(angles[i]), 0, w)
-            new_y = np.clip(vertex[-1][1] + r * math.sin(angles[i]), 0, h)
-            vertex.append((int(new_x), int(new_y)))
+        r_list = np.clip(
+            rng.normal(
+                loc=average_radius, scale=average_radius // 2,
+                size=num_vertex),
+            0, 2 * average_radius)
+        step_x = (r_list * np.cos(angles)).tolist()
+        step_y = (r_list * np.sin(angles)).tolist()
+        # the walk is clipped at every step, so it is done on python scalars
+        # which are much cheaper than indexing numpy arrays element-wise.
+        x, y = start_list[loop_n].tolist()
+        vertex = [(x, y)]
+        for dx, dy in zip(step_x, step_y, strict=True):
+            x = int(min(max(x + dx, 0), img_w))
+            y = int(min(max(y + dy, 0), img_h))
+            vertex.append((x, y))
         # draw brush strokes according to the vertex and angle list
-        draw = ImageDraw.Draw(mask)
-        width = np.random.randint(min_width, max_width)
-        draw.line(vertex, fill=1, width=width)
+        width = int(width_list[loop_n])
+        points = np.array(vertex, dtype=np.int32).reshape(-1, 1, 2)
+        cv2.polylines(mask, [points], isClosed=False, color=1,
+                      thickness=width)
         for v in vertex:
-            draw.ellipse((v[0] - width // 2, v[1] - width // 2,
-                          v[0] + width // 2, v[1] + width // 2),
-                         fill=1)
+            cv2.circle(mask, v, width // 2, 1, -1)
     # randomly flip the mask
-    if np.random.normal() > 0:
-        mask.transpose(Image.FLIP_LEFT_RIGHT)
-    if np.random.normal() > 0:
-        mask.transpose(Image.FLIP_TOP_BOTTOM)
-    mask = np.array(mask).astype(dtype=getattr(np, dtype))
+    flip_prob = 0.5
+    flip_h, flip_v = rng.random(size=2) > flip_prob
+    if flip_h:
+        mask = mask[:, ::-1]
+    if flip_v:
+        mask = mask[::-1]
+    # torch cannot wrap arrays with negative strides
+    mask = np.ascontiguousarray(mask)
     return mask[:, :, None]
 
 
@@ -405,14 +550,48 @@ class LoadMask(BaseTransform):
             * set: randomly get a mask from a mask set.
             * whole: use the whole image as mask.
         mask_config (dict): Params for creating masks. Each type of mask needs
-            different configs. Default: None.
+            different configs. An integer `num_vertices`, `length_range` or
+            `brush_width` fixes the value. Default: None.
+        defer_bbox_mask (bool): If True, the 'bbox' mode stores
+            ``dict(bbox=(top, left, h, w), shape=(h, w))`` as 'mask' instead
+            of a dense array. It is rasterized by :class:`MaskToTensor`.
+            Default: False.
+        reuse_bbox_mask (bool): If True, the 'bbox' mode draws into a buffer
+            cached per image shape and only clears the previous box instead
+            of allocating a new mask for every sample. The returned mask is
+            overwritten by the next call, so consumers must copy it if they
+            keep it across samples. :class:`MaskToTensor` copies it.
+            Default: False.
     """
 
     def __init__(self, mask_mode: str = "bbox",
-                 mask_config: dict | None = None) -> None:
+                 mask_config: dict | None = None,
+                 *,
+                 defer_bbox_mask: bool = False,
+                 reuse_bbox_mask: bool = False) -> None:
         self.mask_mode = mask_mode
-        self.mask_config = dict() if mask_config is None else mask_config
-        assert isinstance(self.mask_config, dict)
+        mask_config = dict() if mask_config is None else mask_config
+        assert isinstance(mask_config, dict)
+        self.mask_config = _normalize_mask_config(mask_config)
+        self.defer_bbox_mask = defer_bbox_mask
+        self.reuse_bbox_mask = reuse_bbox_mask
+        self._bbox_scratch: dict[tuple[int, int], np.ndarray] = {}
+        self._last_bbox: dict[tuple[int, int], tuple[int, int, int, int]] = {}
+
+    def _bbox2mask_reuse(self, img_shape: tuple[int, int],
+                         bbox: tuple[int, int, int, int]) -> np.ndarray:
+        """Draw the bbox mask into the cached buffer of ``img_shape``."""
+        key = img_shape[:2]
+        if key not in self._bbox_scratch:
+            self._bbox_scratch[key] = np.zeros((*key, 1), dtype=np.uint8)
+        mask = self._bbox_scratch[key]
+        if key in self._last_bbox:
+            top, left, h, w = self._last_bbox[key]
+            mask[top:top + h, left:left + w] = 0
+        top, left, h, w = bbox
+        mask[top:top + h, left:left + w] = 1
+        self._last_bbox[key] = bbox
+        return mask
 
     def transform(self, results: dict) -> dict:
         """Transform function.
@@ -430,7 +609,12 @@ class LoadMask(BaseTransform):
         if self.mask_mode == "bbox":
             mask_bbox = random_bbox(img_shape=img_shape,
                                     **self.mask_config)
-            mask = bbox2mask(img_shape, mask_bbox)
+            if self.defer_bbox_mask:
+                mask = dict(bbox=mask_bbox, shape=img_shape)
+            elif self.reuse_bbox_mask:
+                mask = self._bbox2mask_reuse(img_shape, mask_bbox)
+            else:
+                mask = bbox2mask(img_shape, mask_bbox)
             results["mask_bbox"] = mask_bbox
         elif self.mask_mode == "irregular":
             mask = get_irregular_mask(img_shape=img_shape,
@@ -13,6 +13,7 @@ import torch
 import torchvision
 from diffusers.utils import is_bs4_available, is_ftfy_available
 from mmengine.dataset.base_dataset import Compose
+from PIL import Image
 from torchvision.transforms.functional import crop
 from torchvision.transforms.transforms import InterpolationMode
 from transformers import AutoImageProcessor
@@ -54,6 +55,10 @@ class TorchVisonTransformWrapper:
     We can use torchvision.transforms like `dict(type='torchvision/Resize',
     size=512)`
 
+    `torchvision.transforms.v2` classes can be passed as `transform` too. For
+    example `v2.Resize` after `PILToTensor` resizes the uint8 tensor with the
+    native uint8 kernel instead of round-tripping through float.
+
     Args:
     ----
         transform (str): The name of transform. For example
@@ -122,6 +127,54 @@ def register_vision_transforms() -> list[str]:
 VISION_TRANSFORMS = register_vision_transforms()
 
 
+@TRANSFORMS.register_module()
+class FusedToTensorNormalize(BaseTransform):
+    """Convert PIL images to tensors normalized to [-1, 1] in one pass.
+
+    This is equivalent to `torchvision/ToTensor` followed by
+    `torchvision/Normalize` with ``mean=[0.5], std=[0.5]``, but it casts the
+    uint8 image once and scales it in place instead of materializing the
+    intermediate [0, 1] tensor.
+
+    Args:
+    ----
+        keys (List[str]): `keys` to apply augmentation from results.
+        dtype (str | torch.dtype): The output dtype. ``bfloat16`` or
+            ``float16`` halve the worker memory and the host to device copy.
+            The scaling is computed in float32 and rounded once.
+            Defaults to 'float32'.
+    """
+
+    def __init__(self, keys: list[str] | None = None,
+                 dtype: str | torch.dtype = "float32") -> None:
+        if keys is None:
+            keys = ["img"]
+        if isinstance(dtype, str):
+            dtype = _str_to_torch_dtype(dtype)
+        self.keys = keys
+        self.dtype = dtype
+
+    def _to_tensor(self, img: Image.Image) -> torch.Tensor:
+        """Convert a PIL image to a normalized (C, H, W) tensor."""
+        return torchvision.transforms.functional.pil_to_tensor(img).to(
+            torch.float32, memory_format=torch.contiguous_format,
+        ).mul_(1 / 127.5).sub_(1.0).to(self.dtype)
+
+    def transform(self, results: dict) -> dict | tuple[list, list] | None:
+        """Transform.
+
+        Args:
+        ----
+            results (dict): The result dict.
+        """
+        for k in self.keys:
+            if not isinstance(results[k], list):
+                results[k] = self._to_tensor(results[k])
+            else:
+                results[k] = [self._to_tensor(img) for img in results[k]]
+        return results
+
+
 @TRANSFORMS.register_module()
 class SaveImageShape(BaseTransform):
     """Save image shape as 'ori_img_shape' in results."""
@@ -149,6 +202,55 @@ class SaveImageShape(BaseTransform):
         return results
 
 
+@TRANSFORMS.register_module()
+class ClampLongestSide(BaseTransform):
+    """Downscale images whose longest side exceeds ``max_size``.
+
+    This is a cheap pre-step for the following resize. PIL first reduces the
+    image by an integer factor and then resamples the rest, so pathological
+    large inputs do not go through the full bilinear filter. Smaller images
+    are left untouched. Put it after `SaveImageShape` so that the original
+    image shape is kept.
+
+    Args:
+    ----
+        max_size (int): Maximum size of the longest side. Defaults to 2048.
+        keys (List[str]): `keys` to apply augmentation from results.
+    """
+
+    def __init__(self, max_size: int = 2048,
+                 keys: list[str] | None = None) -> None:
+        if keys is None:
+            keys = ["img"]
+        self.max_size = max_size
+        self.keys = keys
+
+    def _clamp(self, img: Image.Image) -> Image.Image:
+        """Clamp the longest side of a PIL image."""
+        longest_side = max(img.size)
+        if longest_side <= self.max_size:
+            return img
+        scale = self.max_size / longest_side
+        size = (max(1, round(img.width * scale)),
+                max(1, round(img.height * scale)))
+        return img.resize(
+            size, resample=Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+    def transform(self, results: dict) -> dict | tuple[list, list] | None:
+        """Transform.
+
+        Args:
+        ----
+            results (dict): The result dict.
+        """
+        for k in self.keys:
+            if not isinstance(results[k], list):
+                results[k] = self._clamp(results[k])
+            else:
+                results[k] = [self._clamp(img) for img in results[k]]
+        return results
+
+
 @TRANSFORMS.register_module()
 class RandomCrop(BaseTransform):
     """RandomCrop.
@@ -790,6 +892,9 @@ class MaskToTensor(BaseTransform):
     1. Convert mask to tensor.
     2. Transpose mask from (H, W, 1) to (1, H, W)
 
+    A bbox mask deferred by ``LoadMask(defer_bbox_mask=True)`` is rasterized
+    directly into the output tensor.
+
     Args:
     ----
         key (str): `key` to apply augmentation from results.
@@ -808,6 +913,12 @@ class MaskToTensor(BaseTransform):
         """
         assert not isinstance(results[self.key], list), (
             "MaskToTensor only support single image.")
+        if isinstance(results[self.key], dict):
+            top, left, h, w = results[self.key]["bbox"]
+            mask = torch.zeros((1, *results[self.key]["shape"][:2]))
+            mask[:, top:top + h, left:left + w] = 1
+            results[self.key] = mask
+            return results
         # (1, 3, 224, 224) -> (3, 224, 224)
         results[self.key] = torch.Tensor(results[self.key]).permute(2, 0, 1)
         return results
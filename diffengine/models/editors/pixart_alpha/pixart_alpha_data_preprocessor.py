@@ -4,9 +4,63 @@ from mmengine.model.base_model.data_preprocessor import BaseDataPreprocessor
 from diffengine.registry import MODELS
 
 
+def _maybe_stack(x: torch.Tensor | list[torch.Tensor]) -> torch.Tensor:
+    """Stack ``x`` unless the collate function already batched it."""
+    return x if torch.is_tensor(x) else torch.stack(x)
+
+
 @MODELS.register_module()
 class PixArtAlphaDataPreprocessor(BaseDataPreprocessor):
-    """PixArtAlphaDataPreprocessor."""
+    """PixArtAlphaDataPreprocessor.
+
+    Args:
+    ----
+        non_blocking (bool): Whether block current process when transferring
+            data to device. Defaults to False.
+        pin_memory (bool): Whether to stack images into a persistent pinned
+            buffer and copy them to the device asynchronously. Only used when
+            the preprocessor is on a CUDA device. Defaults to True.
+    """
+
+    def __init__(self, *, non_blocking: bool | None = False,
+                 pin_memory: bool = True) -> None:
+        super().__init__(non_blocking=non_blocking)
+        self.pin_memory = pin_memory
+        self._pinned_img_buf: torch.Tensor | None = None
+        self._copy_done: torch.cuda.Event | None = None
+
+    def _stack_img(
+            self, imgs: torch.Tensor | list[torch.Tensor]) -> torch.Tensor:
+        """Stack images and copy them to the device.
+
+        On CUDA, images are stacked into a pinned buffer sized by the first
+        batch, so that the host to device copy can overlap with compute.
+        Batches that do not fit the buffer are stacked and pinned on the fly.
+        """
+        if not (self.pin_memory and torch.cuda.is_available()
+                and self.device.type == "cuda"):
+            return _maybe_stack(imgs)
+
+        shape = (len(imgs), *imgs[0].shape)
+        if self._pinned_img_buf is None:
+            self._pinned_img_buf = torch.empty(
+                shape, dtype=imgs[0].dtype, pin_memory=True)
+        buf = self._pinned_img_buf
+        if buf.shape[1:] == shape[1:] and buf.shape[0] >= shape[0] and (
+                buf.dtype == imgs[0].dtype):
+            # the previous batch may still be copied from the buffer
+            if self._copy_done is not None:
+                self._copy_done.synchronize()
+            if torch.is_tensor(imgs):
+                img = buf[:shape[0]].copy_(imgs)
+            else:
+                img = torch.stack(imgs, out=buf[:shape[0]])
+        else:
+            img = _maybe_stack(imgs).pin_memory()
+        img = img.to(self.device, non_blocking=True)
+        self._copy_done = torch.cuda.Event()
+        self._copy_done.record()
+        return img
 
     def forward(
             self,
@@ -43,12 +97,12 @@ class PixArtAlphaDataPreprocessor(BaseDataPreprocessor):
                     "aspect_ratio"] + data[
                         "inputs"]["result_class_image"].pop("aspect_ratio")
 
-        data["inputs"]["img"] = torch.stack(data["inputs"]["img"])
+        data["inputs"]["img"] = self._stack_img(data["inputs"]["img"])
         # pre-compute text embeddings
         if "resolution" in data["inputs"]:
-            data["inputs"]["resolution"] = torch.stack(
+            data["inputs"]["resolution"] = _maybe_stack(
                 data["inputs"]["resolution"])
         if "aspect_ratio" in data["inputs"]:
-            data["inputs"]["aspect_ratio"] = torch.stack(
+            data["inputs"]["aspect_ratio"] = _maybe_stack(
                 data["inputs"]["aspect_ratio"])
         return super().forward(data)
@@ -270,6 +270,8 @@ class SSD1B(StableDiffusionXL):
     def _forward_vae(self, img: torch.Tensor, num_batches: int,
                      ) -> torch.Tensor:
         """Forward vae."""
+        # the dataset may emit half precision images
+        img = img.to(self.vae.dtype)
         latents = [
             self.vae.encode(
                 img[i : i + self.vae_batch_size],
@@ -6,7 +6,45 @@ from diffengine.registry import MODELS
 
 @MODELS.register_module()
 class SDXLDataPreprocessor(BaseDataPreprocessor):
-    """SDXLDataPreprocessor."""
+    """SDXLDataPreprocessor.
+
+    If the pipeline packs 'ori_img_shape' and 'crop_top_left' instead of
+    'time_ids', the time ids are computed here for the whole batch rather
+    than by :class:`ComputeTimeIds` for every sample.
+    """
+
+    def _stack(self, tensors: list[torch.Tensor]) -> torch.Tensor:
+        """Stack the tensor list on the target device.
+
+        Each sample is copied before stacking so that samples pinned by the
+        DataLoader (``pin_memory=True``) are copied asynchronously. Stacking
+        on the CPU first would produce a new pageable tensor.
+        """
+        cuda = self.device.type == "cuda"
+        return torch.stack([
+            t.to(self.device, non_blocking=cuda and t.is_pinned())
+            for t in tensors])
+
+    def _compute_time_ids(self, inputs: dict) -> torch.Tensor:
+        """Compute (original size, crop top-left, target size) of the batch.
+
+        Args:
+        ----
+            inputs (dict): Inputs with the stacked 'img', 'ori_img_shape' and
+                'crop_top_left'.
+
+        Returns:
+        -------
+            torch.Tensor: Time ids in the shape of (N, 6).
+        """
+        img = inputs["img"]
+        target_size = torch.tensor(
+            img.shape[-2:], device=self.device).expand(len(img), 2)
+        return torch.cat([
+            self._stack(inputs.pop("ori_img_shape")),
+            self._stack(inputs.pop("crop_top_left")),
+            target_size,
+        ], dim=1)
 
     def forward(
             self,
@@ -34,16 +72,23 @@ class SDXLDataPreprocessor(BaseDataPreprocessor):
                 "result_class_image"].pop("text")
             data["inputs"]["img"] = data["inputs"]["img"] + data["inputs"][
                 "result_class_image"].pop("img")
-            data["inputs"]["time_ids"] = data["inputs"]["time_ids"] + data[
-                "inputs"]["result_class_image"].pop("time_ids")
+            for key in ["time_ids", "ori_img_shape", "crop_top_left"]:
+                if key in data["inputs"]:
+                    data["inputs"][key] = data["inputs"][key] + data[
+                        "inputs"]["result_class_image"].pop(key)
 
-        data["inputs"]["img"] = torch.stack(data["inputs"]["img"])
-        data["inputs"]["time_ids"] = torch.stack(data["inputs"]["time_ids"])
+        data["inputs"]["img"] = self._stack(data["inputs"]["img"])
+        if "time_ids" in data["inputs"]:
+            data["inputs"]["time_ids"] = self._stack(
+                data["inputs"]["time_ids"])
+        else:
+            data["inputs"]["time_ids"] = self._compute_time_ids(
+                data["inputs"])
         # pre-compute text embeddings
         if "prompt_embeds" in data["inputs"]:
-            data["inputs"]["prompt_embeds"] = torch.stack(
+            data["inputs"]["prompt_embeds"] = self._stack(
                 data["inputs"]["prompt_embeds"])
         if "pooled_prompt_embeds" in data["inputs"]:
-            data["inputs"]["pooled_prompt_embeds"] = torch.stack(
+            data["inputs"]["pooled_prompt_embeds"] = self._stack(
                 data["inputs"]["pooled_prompt_embeds"])
         return super().forward(data)
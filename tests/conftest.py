@@ -0,0 +1,38 @@
+import contextlib
+import os
+
+import torch
+
+# Hub repos shared by many model tests.
+PREWARM_REPOS = (
+    "hf-internal-testing/tiny-stable-diffusion-xl-pipe",
+    "hf-internal-testing/unidiffuser-diffusers-test",
+    "hf-internal-testing/tiny-controlnet-sdxl",
+)
+# the configs, tokenizer files and weights loaded by ``from_pretrained``
+PREWARM_PATTERNS = ("*.json", "*.txt", "*.safetensors")
+
+# The test tensors are tiny, so spawning the intra-op thread pool costs more
+# than the ops themselves. Set ``DIFFENGINE_TEST_NUM_THREADS`` to override.
+_NUM_THREADS = int(os.environ.setdefault("DIFFENGINE_TEST_NUM_THREADS", "1"))
+torch.set_num_threads(_NUM_THREADS)
+with contextlib.suppress(RuntimeError):
+    # fails if inter-op work has already started
+    torch.set_num_interop_threads(_NUM_THREADS)
+
+
+def pytest_configure(config) -> None:
+    """Download the shared Hub repos once before the tests start.
+
+    Opt in with ``DIFFENGINE_TEST_PREWARM=1``. With pytest-xdist this runs in
+    the controller only, before the workers are spawned, so the workers find
+    a warm cache instead of waiting on each other's download locks. Without
+    network, each test resolves its own files as before.
+    """
+    if os.environ.get("DIFFENGINE_TEST_PREWARM") != "1" or hasattr(
+            config, "workerinput"):
+        return
+    from huggingface_hub import snapshot_download
+    with contextlib.suppress(OSError):
+        for repo in PREWARM_REPOS:
+            snapshot_download(repo, allow_patterns=list(PREWARM_PATTERNS))
@@ -1,4 +1,5 @@
 import numpy as np
+import torch
 from mmengine.testing import RunnerTestCase
 from PIL import Image
 
@@ -47,3 +48,22 @@ class TestHFDatasetPreComputeEmbs(RunnerTestCase):
         assert np.array(data["pooled_prompt_embeds"]).shape == (32, )
         assert isinstance(data["img"], Image.Image)
         assert data["img"].width == 400
+
+    def test_dataset_embed_cache(self):
+        for _ in range(2):
+            # the second run reads the cached files
+            dataset = HFDatasetPreComputeEmbs(
+                dataset="tests/testdata/dataset",
+                model="hf-internal-testing/tiny-stable-diffusion-xl-pipe",
+                image_column="file_name",
+                device="cpu",
+                embed_cache_dir=self.temp_dir.name)
+            assert len(dataset) == 1
+
+            data = dataset[0]
+            assert "text" not in data
+            assert isinstance(data["prompt_embeds"], torch.Tensor)
+            assert isinstance(data["pooled_prompt_embeds"], torch.Tensor)
+            assert data["prompt_embeds"].shape == (77, 64)
+            assert data["pooled_prompt_embeds"].shape == (32, )
+            assert isinstance(data["img"], Image.Image)
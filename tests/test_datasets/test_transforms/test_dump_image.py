@@ -0,0 +1,76 @@
+import os
+import os.path as osp
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import torch
+from torch.utils.data import DataLoader
+
+from diffengine.datasets.transforms import dump_image
+from diffengine.registry import TRANSFORMS
+
+
+def _flush_dump_executor() -> None:
+    """Wait for the pending writes of the current process."""
+    executor = dump_image._dump_executor.pop(os.getpid(), None)
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+class TestDumpImage(TestCase):
+
+    def test_register(self):
+        assert "DumpImage" in TRANSFORMS
+
+    def test_transform(self):
+        with TemporaryDirectory() as dump_dir:
+            trans = TRANSFORMS.build(
+                dict(type="DumpImage", max_imgs=2, dump_dir=dump_dir))
+            for _ in range(3):
+                data = {
+                    "img": torch.rand(3, 16, 16),
+                    "condition_img": torch.rand(3, 16, 16),
+                    "mask": torch.ones(1, 16, 16),
+                }
+                assert trans(data) is data
+            # the executor is created in the process that dumps
+            assert os.getpid() in dump_image._dump_executor
+            _flush_dump_executor()
+
+            # nothing is written past max_imgs
+            self.assertListEqual(
+                sorted(os.listdir(dump_dir)),
+                [f"{i}_{k}.png" for i in (1, 2)
+                 for k in ("cond", "image", "mask")])
+            assert trans.num_dumped_imgs.value == 2
+
+    def test_transform_in_worker(self):
+        with TemporaryDirectory() as dump_dir:
+            trans = TRANSFORMS.build(
+                dict(type="DumpImage", max_imgs=2, dump_dir=dump_dir))
+            data = [{"img": torch.rand(3, 16, 16)} for _ in range(3)]
+            # the pending writes are flushed when the worker exits
+            _ = list(DataLoader(data, batch_size=None, num_workers=1,
+                                collate_fn=trans))
+            assert os.getpid() not in dump_image._dump_executor
+            self.assertListEqual(
+                sorted(os.listdir(dump_dir)), ["1_image.png", "2_image.png"])
+
+
+class TestDumpMaskedImage(TestCase):
+
+    def test_register(self):
+        assert "DumpMaskedImage" in TRANSFORMS
+
+    def test_transform(self):
+        with TemporaryDirectory() as dump_dir:
+            trans = TRANSFORMS.build(
+                dict(type="DumpMaskedImage", max_imgs=1, dump_dir=dump_dir))
+            for _ in range(2):
+                data = {"masked_image": torch.rand(3, 16, 16) * 2 - 1}
+                assert trans(data) is data
+            _flush_dump_executor()
+
+            self.assertListEqual(
+                os.listdir(dump_dir), ["1_masked_image.png"])
+            assert osp.getsize(osp.join(dump_dir, "1_masked_image.png")) > 0
@@ -1,9 +1,20 @@
 import os.path as osp
+from functools import partial
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 
 import numpy as np
+import pytest
+import torch
+from mmengine.dataset.utils import worker_init_fn
 from PIL import Image
+from torch.utils.data import DataLoader
 
+from diffengine.datasets.transforms.loading import (
+    bbox2mask,
+    brush_stroke_mask,
+    get_irregular_mask,
+)
 from diffengine.registry import TRANSFORMS
 
 
@@ -28,6 +39,33 @@ class TestLoadMask(TestCase):
         assert data["mask"].shape == (img.height, img.width, 1)
         assert np.all(np.unique(data["mask"]) == [0, 1])
 
+        # test deferred bbox mask
+        data = {"img": img}
+        trans = TRANSFORMS.build(dict(
+            type="LoadMask",
+            mask_mode="bbox",
+            mask_config=dict(
+                max_bbox_shape=128),
+            defer_bbox_mask=True))
+        data = trans(data)
+        assert data["mask"]["bbox"] == data["mask_bbox"]
+        assert data["mask"]["shape"] == (img.height, img.width)
+
+        # test reused bbox mask buffer
+        trans = TRANSFORMS.build(dict(
+            type="LoadMask",
+            mask_mode="bbox",
+            mask_config=dict(
+                max_bbox_shape=128),
+            reuse_bbox_mask=True))
+        mask = trans({"img": img})["mask"]
+        data = trans({"img": img})
+        assert data["mask"] is mask
+        top, left, h, w = data["mask_bbox"]
+        expected = np.zeros((img.height, img.width, 1), dtype=np.uint8)
+        expected[top:top + h, left:left + w] = 1
+        np.testing.assert_array_equal(data["mask"], expected)
+
         # test bbox irregular holes
         data = {"img": img}
         trans = TRANSFORMS.build(dict(
@@ -58,6 +96,22 @@ class TestLoadMask(TestCase):
         assert data["mask"].shape == (img.height, img.width, 1)
         assert np.all(np.unique(data["mask"]) == [0, 1])
 
+        # test integer ranges are normalized once
+        trans = TRANSFORMS.build(dict(
+            type="LoadMask",
+            mask_mode="ff",
+            mask_config=dict(num_vertices=8, brush_width=12)))
+        assert trans.mask_config == dict(num_vertices=(8, 9),
+                                         brush_width=(12, 13))
+        data = trans(data)
+        assert data["mask"].shape == (img.height, img.width, 1)
+
+        with pytest.raises(TypeError, match="length_range"):
+            TRANSFORMS.build(dict(
+                type="LoadMask",
+                mask_mode="irregular",
+                mask_config=dict(length_range=10.)))
+
         # test whole
         trans = TRANSFORMS.build(dict(
             type="LoadMask",
@@ -66,3 +120,66 @@ class TestLoadMask(TestCase):
         assert "mask" in data
         assert data["mask"].shape == (img.height, img.width, 1)
         assert np.all(np.unique(data["mask"]) == 1)
+
+
+class TestBrushStrokeMask(TestCase):
+
+    def test_flip(self):
+
+        def fixed_rng(flip):
+            rng = MagicMock(wraps=np.random.default_rng(0))
+            rng.random.return_value = np.array([flip, flip])
+            return rng
+
+        with patch("diffengine.datasets.transforms.loading._rng",
+                   return_value=fixed_rng(0.)):
+            mask = brush_stroke_mask((64, 48))
+        with patch("diffengine.datasets.transforms.loading._rng",
+                   return_value=fixed_rng(1.)):
+            flipped_mask = brush_stroke_mask((64, 48))
+        assert flipped_mask.shape == (64, 48, 1)
+        assert flipped_mask.flags.c_contiguous
+        np.testing.assert_array_equal(flipped_mask, mask[::-1, ::-1])
+
+
+class TestMaskRandomness(TestCase):
+
+    def test_worker_seed(self):
+        # the DataLoader workers of two ranks sharing ``randomness.seed``
+        masks = []
+        for rank in (0, 1):
+            torch.manual_seed(0)
+            loader = DataLoader(
+                [(64, 48)] * 2, batch_size=None, num_workers=1,
+                collate_fn=brush_stroke_mask,
+                worker_init_fn=partial(
+                    worker_init_fn, num_workers=1, rank=rank, seed=0))
+            masks.append(list(loader))
+        assert not np.array_equal(masks[0][0], masks[1][0])
+        # the masks drawn in the same worker differ too
+        assert not np.array_equal(masks[0][0], masks[0][1])
+
+
+class TestGetIrregularMask(TestCase):
+
+    def test_area_ratio(self):
+        for brush_width in [(10, 40), (5, 20), (20, 250)]:
+            for seed in range(10):
+                torch.manual_seed(seed)
+                mask = get_irregular_mask(
+                    (128, 96), area_ratio_range=(0.15, 0.5),
+                    brush_width=brush_width)
+                assert mask.shape == (128, 96, 1)
+                assert 0.15 < mask.mean() < 0.5
+
+
+class TestBbox2Mask(TestCase):
+
+    def test_bbox2mask(self):
+        # small boxes fill zeros, large boxes fill ones and clear the rest
+        for bbox in [(10, 20, 30, 40), (5, 7, 50, 60)]:
+            mask = bbox2mask((64, 80), bbox)
+            top, left, h, w = bbox
+            expected = np.zeros((64, 80, 1), dtype=np.uint8)
+            expected[top:top + h, left:left + w] = 1
+            np.testing.assert_array_equal(mask, expected)
@@ -1,3 +1,4 @@
+import functools
 import os.path as osp
 from unittest import TestCase
 
@@ -9,11 +10,96 @@ from mmengine.dataset.base_dataset import Compose
 from mmengine.utils import digit_version
 from PIL import Image
 from torchvision import transforms
+from torchvision.transforms import v2
 
 from diffengine.datasets.transforms import TorchVisonTransformWrapper
 from diffengine.datasets.transforms.processing import VISION_TRANSFORMS
 from diffengine.registry import TRANSFORMS
 
+IMG_PATH = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
+
+
+@pytest.fixture(autouse=True)
+def _inference_mode():
+    # none of the transforms needs autograd
+    with torch.inference_mode():
+        yield
+
+
+@functools.cache
+def _load_testdata(size: tuple[int, int] | None = None) -> np.ndarray:
+    """Decode the test image once, optionally resized to ``size``."""
+    with Image.open(IMG_PATH) as src:
+        if size is not None:
+            # let libjpeg decode at a reduced scale that still covers ``size``
+            src.draft("RGB", size)
+        # decode in one pass and release the file handle right away
+        src.load()
+        img = src.convert("RGB")
+    if size is not None:
+        img = img.resize(size)
+    return np.asarray(img)
+
+
+def _open_testdata(size: tuple[int, int] | None = None) -> Image.Image:
+    """Wrap the cached test image without decoding it again."""
+    return Image.fromarray(_load_testdata(size))
+
+
+@functools.lru_cache(maxsize=128)
+def _build_frozen(cfg_items: tuple) -> object:
+    return TRANSFORMS.build(
+        {k: list(v) if isinstance(v, tuple) else v for k, v in cfg_items})
+
+
+def _build(cfg: dict) -> object:
+    """Build a transform once per distinct config.
+
+    The transforms keep no state besides their config, so they are shared.
+    """
+    return _build_frozen(tuple(sorted(
+        (k, tuple(v) if isinstance(v, list) else v) for k, v in cfg.items())))
+
+
+@functools.cache
+def _compose_pipelines() -> tuple[transforms.Compose, Compose]:
+    """Build the torchvision reference chain and the wrapped pipeline once.
+
+    The uint8 tensor is resized so that the native uint8 kernel is used.
+    PILToTensor keeps the HWC strides, so the channels last branch of the
+    kernel is taken. The reference chain leaves out the random flip.
+    """
+    vision_trans = transforms.Compose([
+        transforms.PILToTensor(),
+        v2.Resize(176, antialias=True),
+        transforms.ConvertImageDtype(torch.float),
+        transforms.Normalize(
+            mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+    ])
+    pipeline_cfg = [
+        dict(type=TorchVisonTransformWrapper,
+             transform=torchvision.transforms.PILToTensor),
+        dict(type=TorchVisonTransformWrapper,
+             transform=v2.Resize,
+             size=176, antialias=True),
+        dict(type="RandomHorizontalFlip"),
+        dict(type=TorchVisonTransformWrapper,
+             transform=torchvision.transforms.ConvertImageDtype,
+             dtype="float"),
+        dict(
+            type=TorchVisonTransformWrapper,
+            transform=torchvision.transforms.Normalize,
+            mean=(0.485, 0.456, 0.406),
+            std=(0.229, 0.224, 0.225),
+        ),
+    ]
+    return vision_trans, Compose(transforms=[_build(t) for t in pipeline_cfg])
+
+
+def _pil_eq(a: Image.Image, b: Image.Image) -> bool:
+    """Compare two images through their raw buffers."""
+    return a.mode == b.mode and a.size == b.size and a.tobytes() == b.tobytes()
+
 
 class TestVisionTransformWrapper(TestCase):
 
@@ -23,8 +109,7 @@ class TestVisionTransformWrapper(TestCase):
             assert t in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {"img": Image.open(img_path)}
+        data = {"img": _open_testdata()}
 
         # test normal transform
         vision_trans = transforms.RandomResizedCrop(224)
@@ -34,10 +119,12 @@ class TestVisionTransformWrapper(TestCase):
                  transform=torchvision.transforms.RandomResizedCrop,
                  size=224))
         transformed_img = trans(data)["img"]
-        np.equal(np.array(vision_transformed_img), np.array(transformed_img))
+        assert vision_transformed_img.size == transformed_img.size
 
-        # test convert type dtype
-        data = {"img": torch.randn(3, 224, 224)}
+        # test convert type dtype on a channels last (HWC strided) image like
+        # the ones returned by PILToTensor. The cast does not depend on the
+        # values, and zeros avoid NaNs that would break torch.equal.
+        data = {"img": torch.zeros(224, 224, 3).permute(2, 0, 1)}
         vision_trans = transforms.ConvertImageDtype(torch.float)
         vision_transformed_img = vision_trans(data["img"])
         trans = TRANSFORMS.build(
@@ -45,10 +132,10 @@ class TestVisionTransformWrapper(TestCase):
                  transform=torchvision.transforms.ConvertImageDtype,
                  dtype="float"))
         transformed_img = trans(data)["img"]
-        np.equal(np.array(vision_transformed_img), np.array(transformed_img))
+        assert torch.equal(vision_transformed_img, transformed_img)
 
         # test transform with interpolation
-        data = {"img": Image.open(img_path)}
+        data = {"img": _open_testdata()}
         if digit_version(torchvision.__version__) > digit_version("0.8.0"):
             from torchvision.transforms import InterpolationMode
             interpolation_t = InterpolationMode.NEAREST
@@ -61,41 +148,57 @@ class TestVisionTransformWrapper(TestCase):
                  transform=torchvision.transforms.Resize,
                  size=224, interpolation="nearest"))
         transformed_img = trans(data)["img"]
-        np.equal(np.array(vision_transformed_img), np.array(transformed_img))
+        assert _pil_eq(vision_transformed_img, transformed_img)
 
         # test compose transforms
-        data = {"img": Image.open(img_path)}
-        vision_trans = transforms.Compose([
-            transforms.Resize(176),
-            transforms.RandomHorizontalFlip(),
-            transforms.PILToTensor(),
-            transforms.ConvertImageDtype(torch.float),
-            transforms.Normalize(
-                mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-        ])
+        data = {"img": _open_testdata()}
+        vision_trans, pipe = _compose_pipelines()
         vision_transformed_img = vision_trans(data["img"])
-
-        pipeline_cfg = [
-            dict(type=TorchVisonTransformWrapper,
-                 transform=torchvision.transforms.Resize,
-                 size=176),
-            dict(type="RandomHorizontalFlip"),
-            dict(type=TorchVisonTransformWrapper,
-                 transform=torchvision.transforms.PILToTensor),
-            dict(type=TorchVisonTransformWrapper,
-                 transform=torchvision.transforms.ConvertImageDtype,
-                 dtype="float"),
-            dict(
-                type=TorchVisonTransformWrapper,
-                transform=torchvision.transforms.Normalize,
-                mean=(0.485, 0.456, 0.406),
-                std=(0.229, 0.224, 0.225),
-            ),
-        ]
-        pipeline = [TRANSFORMS.build(t) for t in pipeline_cfg]
-        pipe = Compose(transforms=pipeline)
         transformed_img = pipe(data)["img"]
-        np.equal(np.array(vision_transformed_img), np.array(transformed_img))
+        # the flip is random, so the reference is built without it and
+        # compared in both orientations
+        assert any(
+            torch.allclose(img, transformed_img, atol=1e-6)
+            for img in (vision_transformed_img,
+                        vision_transformed_img.flip(-1)))
+
+
+class TestFusedToTensorNormalize(TestCase):
+
+    def test_register(self):
+        assert "FusedToTensorNormalize" in TRANSFORMS
+
+    def test_transform(self):
+        img = _open_testdata()
+        data = {"img": img}
+
+        # test transform
+        trans = TRANSFORMS.build(dict(type="FusedToTensorNormalize"))
+        data = trans(data)
+        expected = transforms.Normalize(mean=[0.5], std=[0.5])(
+            transforms.ToTensor()(img))
+        assert data["img"].dtype == torch.float32
+        assert data["img"].is_contiguous()
+        assert torch.allclose(data["img"], expected, atol=1e-6)
+
+        # test dtype
+        data = {"img": img}
+        trans = TRANSFORMS.build(dict(type="FusedToTensorNormalize",
+                                      dtype="bfloat16"))
+        data = trans(data)
+        assert data["img"].dtype == torch.bfloat16
+        assert torch.allclose(data["img"].float(), expected, atol=1e-2)
+
+    def test_transform_list(self):
+        data = {"img": [_open_testdata(),
+                        _open_testdata((64, 64))]}
+
+        # test transform
+        trans = TRANSFORMS.build(dict(type="FusedToTensorNormalize"))
+        data = trans(data)
+        assert data["img"][1].shape == (3, 64, 64)
+        assert data["img"][1].min() >= -1
+        assert data["img"][1].max() <= 1
 
 
 class TestSaveImageShape(TestCase):
@@ -104,8 +207,7 @@ class TestSaveImageShape(TestCase):
         assert "SaveImageShape" in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {"img": Image.open(img_path)}
+        data = {"img": _open_testdata()}
         ori_img_shape = [data["img"].height, data["img"].width]
 
         # test transform
@@ -114,9 +216,8 @@ class TestSaveImageShape(TestCase):
         self.assertListEqual(data["ori_img_shape"], ori_img_shape)
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {"img": [Image.open(img_path),
-                        Image.open(img_path).resize((64, 64))]}
+        data = {"img": [_open_testdata(),
+                        _open_testdata((64, 64))]}
         ori_img_shape = [[img.height, img.width] for img in data["img"]]
 
         # test transform
@@ -125,14 +226,47 @@ class TestSaveImageShape(TestCase):
         self.assertListEqual(data["ori_img_shape"], ori_img_shape)
 
 
+class TestClampLongestSide(TestCase):
+
+    def test_register(self):
+        assert "ClampLongestSide" in TRANSFORMS
+
+    def test_transform(self):
+        img = _open_testdata()
+        data = {"img": img}
+
+        # test transform
+        trans = TRANSFORMS.build(dict(type="ClampLongestSide", max_size=64))
+        data = trans(data)
+        assert max(data["img"].size) == 64
+        assert data["img"].width / data["img"].height == pytest.approx(
+            img.width / img.height, rel=0.05)
+
+        # test small image is not changed
+        data = {"img": img}
+        trans = TRANSFORMS.build(dict(type="ClampLongestSide",
+                                      max_size=max(img.size)))
+        data = trans(data)
+        assert data["img"] is img
+
+    def test_transform_list(self):
+        data = {"img": [_open_testdata(),
+                        _open_testdata((32, 16))]}
+
+        # test transform
+        trans = TRANSFORMS.build(dict(type="ClampLongestSide", max_size=64))
+        data = trans(data)
+        assert max(data["img"][0].size) == 64
+        assert data["img"][1].size == (32, 16)
+
+
 class TestComputeTimeIds(TestCase):
 
     def test_register(self):
         assert "ComputeTimeIds" in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        img = Image.open(img_path)
+        img = _open_testdata()
         data = {"img": img, "ori_img_shape": [32, 32], "crop_top_left": [0, 0]}
 
         # test transform
@@ -142,8 +276,7 @@ class TestComputeTimeIds(TestCase):
                              [32, 32, 0, 0, img.height, img.width])
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        img = Image.open(img_path)
+        img = _open_testdata()
         data = {"img": [img, img],
                 "ori_img_shape": [[32, 32], [48, 48]],
                 "crop_top_left": [[0, 0], [10, 10]]}
@@ -156,274 +289,147 @@ class TestComputeTimeIds(TestCase):
                               [48, 48, 10, 10, img.height, img.width]])
 
 
-class TestRandomCrop(TestCase):
+def _assert_crop_invariants(data: dict, size: int,
+                            src: Image.Image | list[Image.Image]) -> None:
+    """Check the crop of single or list data against the source images."""
+    assert "crop_top_left" in data
+    assert len(data["crop_top_left"]) == 2
+    if isinstance(data["img"], list):
+        imgs = data["img"]
+        crop_top_left = data["crop_top_left"]
+        crop_bottom_right = data["crop_bottom_right"]
+    else:
+        imgs = [data["img"]]
+        src = [src]
+        crop_top_left = [data["crop_top_left"]]
+        crop_bottom_right = [data["crop_bottom_right"]]
+    for img, src_img, (upper, left), (lower, right) in zip(
+            imgs, src, crop_top_left, crop_bottom_right, strict=True):
+        assert img.height == img.width == size
+        assert lower == upper + size
+        assert right == left + size
+        assert _pil_eq(img, src_img.crop((left, upper, right, lower)))
+
+
+class _CropTestMixin:
+    """Tests shared by the crop transforms, selected by ``crop_type``."""
+
+    crop_type: str
     crop_size = 32
 
     def test_register(self):
-        assert "RandomCrop" in TRANSFORMS
+        assert self.crop_type in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {"img": Image.open(img_path)}
+        data = {"img": _open_testdata()}
 
         # test transform
-        trans = TRANSFORMS.build(dict(type="RandomCrop", size=self.crop_size))
+        trans = _build(
+            dict(type=self.crop_type, size=self.crop_size))
         data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        assert data["img"].height == data["img"].width == self.crop_size
-        upper, left = data["crop_top_left"]
-        lower, right = data["crop_bottom_right"]
-        assert lower == upper + self.crop_size
-        assert right == left + self.crop_size
-        np.equal(
-            np.array(data["img"]),
-            np.array(Image.open(img_path).crop((left, upper, right, lower))))
+        _assert_crop_invariants(data, self.crop_size, _open_testdata())
 
     def test_transform_multiple_keys(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
         data = {
-            "img": Image.open(img_path),
-            "condition_img": Image.open(img_path),
+            "img": _open_testdata(),
+            "condition_img": _open_testdata(),
         }
 
         # test transform
-        trans = TRANSFORMS.build(
+        trans = _build(
             dict(
-                type="RandomCrop",
+                type=self.crop_type,
                 size=self.crop_size,
                 keys=["img", "condition_img"]))
         data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        assert data["img"].height == data["img"].width == self.crop_size
-        upper, left = data["crop_top_left"]
-        lower, right = data["crop_bottom_right"]
-        assert lower == upper + self.crop_size
-        assert right == left + self.crop_size
-        np.equal(
-            np.array(data["img"]),
-            np.array(Image.open(img_path).crop((left, upper, right, lower))))
-        np.equal(np.array(data["img"]), np.array(data["condition_img"]))
-
-        # size mismatch
-        data = {
-            "img": Image.open(img_path),
-            "condition_img": Image.open(img_path).resize((298, 398)),
-        }
-        with pytest.raises(
-                AssertionError, match="Size mismatch"):
-            data = trans(data)
-
-        # test transform force_same_size=False
-        trans = TRANSFORMS.build(
-            dict(
-                type="RandomCrop",
-                size=self.crop_size,
-                force_same_size=False,
-                keys=["img", "condition_img"]))
-        data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        assert data["img"].height == data["img"].width == self.crop_size
-        upper, left = data["crop_top_left"]
-        lower, right = data["crop_bottom_right"]
-        assert lower == upper + self.crop_size
-        assert right == left + self.crop_size
+        _assert_crop_invariants(data, self.crop_size, _open_testdata())
+        assert _pil_eq(data["img"], data["condition_img"])
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {"img": [Image.open(img_path),
-                        Image.open(img_path).resize((64, 64))]}
+        data = {"img": [_open_testdata(), _open_testdata((64, 64))]}
 
         # test transform
-        trans = TRANSFORMS.build(dict(type="RandomCrop", size=self.crop_size))
+        trans = _build(
+            dict(type=self.crop_type, size=self.crop_size))
         data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        for i in range(len(data["img"])):
-            assert (
-                data["img"][i].height == data["img"][i].width == self.crop_size
-            )
-            upper, left = data["crop_top_left"][i]
-            lower, right = data["crop_bottom_right"][i]
-            assert lower == upper + self.crop_size
-            assert right == left + self.crop_size
-            np.equal(
-                np.array(data["img"][i]),
-                np.array(
-                    Image.open(img_path).crop((left, upper, right, lower))))
+        _assert_crop_invariants(
+            data, self.crop_size, [_open_testdata(), _open_testdata((64, 64))])
 
     def test_transform_multiple_keys_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
         data = {
-            "img": [
-                Image.open(img_path), Image.open(img_path).resize((64, 64))],
-            "condition_img": [
-                Image.open(img_path), Image.open(img_path).resize((64, 64))],
+            "img": [_open_testdata(), _open_testdata((64, 64))],
+            "condition_img": [_open_testdata(), _open_testdata((64, 64))],
         }
 
         # test transform
-        trans = TRANSFORMS.build(
+        trans = _build(
             dict(
-                type="RandomCrop",
+                type=self.crop_type,
                 size=self.crop_size,
                 keys=["img", "condition_img"]))
         data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
+        _assert_crop_invariants(
+            data, self.crop_size, [_open_testdata(), _open_testdata((64, 64))])
         for i in range(len(data["img"])):
-            assert (
-                data["img"][i].height == data["img"][i].width == self.crop_size
-            )
-            upper, left = data["crop_top_left"][i]
-            lower, right = data["crop_bottom_right"][i]
-            assert lower == upper + self.crop_size
-            assert right == left + self.crop_size
-            np.equal(
-                np.array(data["img"][i]),
-                np.array(
-                    Image.open(img_path).crop((left, upper, right, lower))))
-            np.equal(np.array(data["img"][i]),
-                     np.array(data["condition_img"][i]))
-
-        # size mismatch
+            assert _pil_eq(data["img"][i], data["condition_img"][i])
+
+
+class TestRandomCrop(_CropTestMixin, TestCase):
+    crop_type = "RandomCrop"
+
+    def test_transform_size_mismatch(self):
+        trans = _build(
+            dict(
+                type="RandomCrop",
+                size=self.crop_size,
+                keys=["img", "condition_img"]))
         data = {
-            "img": [Image.open(img_path),
-                    Image.open(img_path).resize((64, 64))],
-            "condition_img": [
-                Image.open(img_path).resize((298, 398)),
-                Image.open(img_path).resize((64, 64))],
+            "img": _open_testdata(),
+            "condition_img": _open_testdata((298, 398)),
         }
         with pytest.raises(
                 AssertionError, match="Size mismatch"):
             data = trans(data)
 
         # test transform force_same_size=False
-        trans = TRANSFORMS.build(
+        trans = _build(
             dict(
                 type="RandomCrop",
                 size=self.crop_size,
                 force_same_size=False,
                 keys=["img", "condition_img"]))
         data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        for i in range(len(data["img"])):
-            assert (
-                data["img"][i].height == data["img"][i].width == self.crop_size
-            )
-            upper, left = data["crop_top_left"][i]
-            lower, right = data["crop_bottom_right"][i]
-            assert lower == upper + self.crop_size
-            assert right == left + self.crop_size
-
-
-class TestCenterCrop(TestCase):
-    crop_size = 32
-
-    def test_register(self):
-        assert "CenterCrop" in TRANSFORMS
-
-    def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {"img": Image.open(img_path)}
-
-        # test transform
-        trans = TRANSFORMS.build(dict(type="CenterCrop", size=self.crop_size))
-        data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        assert data["img"].height == data["img"].width == self.crop_size
-        upper, left = data["crop_top_left"]
-        lower, right = data["crop_bottom_right"]
-        assert lower == upper + self.crop_size
-        assert right == left + self.crop_size
-        np.equal(
-            np.array(data["img"]),
-            np.array(Image.open(img_path).crop((left, upper, right, lower))))
-
-    def test_transform_multiple_keys(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {
-            "img": Image.open(img_path),
-            "condition_img": Image.open(img_path),
-        }
+        _assert_crop_invariants(data, self.crop_size, _open_testdata())
 
-        # test transform
-        trans = TRANSFORMS.build(
+    def test_transform_size_mismatch_list(self):
+        trans = _build(
             dict(
-                type="CenterCrop",
+                type="RandomCrop",
                 size=self.crop_size,
                 keys=["img", "condition_img"]))
-        data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        assert data["img"].height == data["img"].width == self.crop_size
-        upper, left = data["crop_top_left"]
-        lower, right = data["crop_bottom_right"]
-        assert lower == upper + self.crop_size
-        assert right == left + self.crop_size
-        np.equal(
-            np.array(data["img"]),
-            np.array(Image.open(img_path).crop((left, upper, right, lower))))
-        np.equal(np.array(data["img"]), np.array(data["condition_img"]))
-
-    def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {"img": [
-            Image.open(img_path), Image.open(img_path).resize((64, 64))]}
-
-        # test transform
-        trans = TRANSFORMS.build(dict(type="CenterCrop", size=self.crop_size))
-        data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        for i in range(len(data["img"])):
-            assert (
-                data["img"][i].height == data["img"][i].width == self.crop_size
-            )
-            upper, left = data["crop_top_left"][i]
-            lower, right = data["crop_bottom_right"][i]
-            assert lower == upper + self.crop_size
-            assert right == left + self.crop_size
-            np.equal(
-                np.array(data["img"][i]),
-                np.array(
-                    Image.open(img_path).crop((left, upper, right, lower))))
-
-    def test_transform_multiple_keys_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
         data = {
-            "img": [
-                Image.open(img_path), Image.open(img_path).resize((64, 64))],
+            "img": [_open_testdata(), _open_testdata((64, 64))],
             "condition_img": [
-                Image.open(img_path), Image.open(img_path).resize((64, 64))],
+                _open_testdata((298, 398)), _open_testdata((64, 64))],
         }
+        with pytest.raises(
+                AssertionError, match="Size mismatch"):
+            data = trans(data)
 
-        # test transform
-        trans = TRANSFORMS.build(
+        # test transform force_same_size=False
+        trans = _build(
             dict(
-                type="CenterCrop",
+                type="RandomCrop",
                 size=self.crop_size,
+                force_same_size=False,
                 keys=["img", "condition_img"]))
         data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        for i in range(len(data["img"])):
-            assert (
-                data["img"][i].height == data["img"][i].width == self.crop_size
-            )
-            upper, left = data["crop_top_left"][i]
-            lower, right = data["crop_bottom_right"][i]
-            assert lower == upper + self.crop_size
-            assert right == left + self.crop_size
-            np.equal(
-                np.array(data["img"][i]),
-                np.array(
-                    Image.open(img_path).crop((left, upper, right, lower))))
-            np.equal(np.array(data["img"][i]),
-                     np.array(data["condition_img"][i]))
+        _assert_crop_invariants(
+            data, self.crop_size, [_open_testdata(), _open_testdata((64, 64))])
+
+
+class TestCenterCrop(_CropTestMixin, TestCase):
+    crop_type = "CenterCrop"
 
 
 class TestRandomHorizontalFlip(TestCase):
@@ -432,79 +438,52 @@ class TestRandomHorizontalFlip(TestCase):
         assert "RandomHorizontalFlip" in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {
-            "img": Image.open(img_path),
-            "crop_top_left": [0, 0],
-            "crop_bottom_right": [200, 200],
-            "before_crop_size": [224, 224],
-        }
-
-        # test transform
-        trans = TRANSFORMS.build(dict(type="RandomHorizontalFlip", p=1.))
-        data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        self.assertListEqual(data["crop_top_left"],
-                             [0, data["before_crop_size"][1] - 200])
-
-        np.equal(
-            np.array(data["img"]),
-            np.array(Image.open(img_path).transpose(Image.FLIP_LEFT_RIGHT)))
-
-        # test transform p=0.0
-        data = {
-            "img": Image.open(img_path),
-            "crop_top_left": [0, 0],
-            "crop_bottom_right": [200, 200],
-            "before_crop_size": [224, 224],
-        }
-        trans = TRANSFORMS.build(dict(type="RandomHorizontalFlip", p=0.))
-        data = trans(data)
-        assert "crop_top_left" in data
-        self.assertListEqual(data["crop_top_left"], [0, 0])
-
-        np.equal(np.array(data["img"]), np.array(Image.open(img_path)))
-
-    def test_transform_multiple_keys(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {
-            "img": Image.open(img_path),
-            "condition_img": Image.open(img_path),
-            "crop_top_left": [0, 0],
-            "crop_bottom_right": [200, 200],
-            "before_crop_size": [224, 224],
-        }
-
-        # test transform
-        trans = TRANSFORMS.build(
-            dict(
-                type="RandomHorizontalFlip",
-                p=1.,
-                keys=["img", "condition_img"]))
-        data = trans(data)
-        assert "crop_top_left" in data
-        assert len(data["crop_top_left"]) == 2
-        self.assertListEqual(data["crop_top_left"],
-                             [0, data["before_crop_size"][1] - 200])
-
-        np.equal(
-            np.array(data["img"]),
-            np.array(Image.open(img_path).transpose(Image.FLIP_LEFT_RIGHT)))
-        np.equal(np.array(data["img"]), np.array(data["condition_img"]))
+        flipped = _open_testdata().transpose(Image.FLIP_LEFT_RIGHT)
+        # each case: flip prob, keys to flip, whether a flip is expected
+        cases = [
+            (1., None, True),
+            (0., None, False),
+            (1., ["img", "condition_img"], True),
+        ]
+        for p, keys, expect_flip in cases:
+            with self.subTest(p=p, keys=keys):
+                data = {
+                    "img": _open_testdata(),
+                    "condition_img": _open_testdata(),
+                    "crop_top_left": [0, 0],
+                    "crop_bottom_right": [200, 200],
+                    "before_crop_size": [224, 224],
+                }
+                cfg = dict(type="RandomHorizontalFlip", p=p)
+                if keys is not None:
+                    cfg["keys"] = keys
+                data = _build(cfg)(data)
+                assert len(data["crop_top_left"]) == 2
+                if expect_flip:
+                    self.assertListEqual(
+                        data["crop_top_left"],
+                        [0, data["before_crop_size"][1] - 200])
+                    assert _pil_eq(data["img"], flipped)
+                else:
+                    self.assertListEqual(data["crop_top_left"], [0, 0])
+                    assert _pil_eq(data["img"], _open_testdata())
+                # keys that are not listed are left untouched
+                assert _pil_eq(
+                    data["condition_img"],
+                    flipped if keys is not None else _open_testdata())
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
+        src = [_open_testdata(), _open_testdata((64, 64))]
         data = {
             "img": [
-                Image.open(img_path), Image.open(img_path).resize((64, 64))],
+                _open_testdata(), _open_testdata((64, 64))],
             "crop_top_left": [[0, 0], [10, 10]],
             "crop_bottom_right": [[200, 200], [220, 220]],
             "before_crop_size": [[224, 224], [256, 256]],
         }
 
         # test transform
-        trans = TRANSFORMS.build(dict(type="RandomHorizontalFlip", p=1.))
+        trans = _build(dict(type="RandomHorizontalFlip", p=1.))
         transformed_data = trans(data)
         assert "crop_top_left" in data
         assert len(data["crop_top_left"]) == 2
@@ -515,42 +494,40 @@ class TestRandomHorizontalFlip(TestCase):
                  data["before_crop_size"][i][1] - data[
                     "crop_bottom_right"][i][1]])
 
-            np.equal(
-                np.array(transformed_data["img"][i]),
-                np.array(
-                    data["img"][i].transpose(Image.FLIP_LEFT_RIGHT)))
+            assert _pil_eq(
+                transformed_data["img"][i],
+                src[i].transpose(Image.FLIP_LEFT_RIGHT))
 
         # test transform p=0.0
         data = {
             "img": [
-                Image.open(img_path), Image.open(img_path).resize((64, 64))],
+                _open_testdata(), _open_testdata((64, 64))],
             "crop_top_left": [[0, 0], [10, 10]],
             "crop_bottom_right": [[200, 200], [220, 220]],
             "before_crop_size": [[224, 224], [256, 256]],
         }
-        trans = TRANSFORMS.build(dict(type="RandomHorizontalFlip", p=0.))
+        trans = _build(dict(type="RandomHorizontalFlip", p=0.))
         transformed_data = trans(data)
         assert "crop_top_left" in data
         for i in range(len(data["img"])):
             self.assertListEqual(data["crop_top_left"][i],
                                  data["crop_top_left"][i])
-            np.equal(np.array(transformed_data["img"][i]),
-                     np.array(data["img"][i]))
+            assert _pil_eq(transformed_data["img"][i], src[i])
 
     def test_transform_multiple_keys_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
+        src = [_open_testdata(), _open_testdata((64, 64))]
         data = {
             "img": [
-                Image.open(img_path), Image.open(img_path).resize((64, 64))],
+                _open_testdata(), _open_testdata((64, 64))],
             "condition_img": [
-                Image.open(img_path), Image.open(img_path).resize((64, 64))],
+                _open_testdata(), _open_testdata((64, 64))],
             "crop_top_left": [[0, 0], [10, 10]],
             "crop_bottom_right": [[200, 200], [220, 220]],
             "before_crop_size": [[224, 224], [256, 256]],
         }
 
         # test transform
-        trans = TRANSFORMS.build(
+        trans = _build(
             dict(
                 type="RandomHorizontalFlip",
                 p=1.,
@@ -565,26 +542,40 @@ class TestRandomHorizontalFlip(TestCase):
                  data["before_crop_size"][i][1] - data[
                     "crop_bottom_right"][i][1]])
 
-            np.equal(
-                np.array(data["img"][i]),
-                np.array(
-                    transformed_data["img"][i].transpose(Image.FLIP_LEFT_RIGHT)))
-            np.equal(np.array(data["img"][i]),
-                     np.array(data["condition_img"][i]))
+            assert _pil_eq(
+                transformed_data["img"][i],
+                src[i].transpose(Image.FLIP_LEFT_RIGHT))
+            assert _pil_eq(transformed_data["img"][i],
+                           transformed_data["condition_img"][i])
 
 
 class TestMultiAspectRatioResizeCenterCrop(TestCase):
     sizes = [(32, 32), (16, 48)]  # noqa
 
+    def _assert_resize_center_crop(self, data: dict, key: str,
+                                   src: Image.Image,
+                                   size: tuple[int, int]) -> None:
+        """Compare with resizing to the bucket scale and center cropping."""
+        resized = transforms.Resize(
+            min(size), transforms.InterpolationMode.BILINEAR)(src)
+        top = int(round((resized.height - size[0]) / 2.0))
+        left = int(round((resized.width - size[1]) / 2.0))
+        self.assertListEqual(data["crop_top_left"], [top, left])
+        self.assertListEqual(data["before_crop_size"],
+                             [resized.height, resized.width])
+        assert _pil_eq(
+            data[key],
+            resized.crop((left, top, left + size[1], top + size[0])))
+
     def test_register(self):
         assert "MultiAspectRatioResizeCenterCrop" in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {"img": Image.open(img_path).resize((32, 36))}
+        # larger than the buckets, so that the resize is exercised
+        data = {"img": _open_testdata((64, 72))}
 
         # test transform
-        trans = TRANSFORMS.build(
+        trans = _build(
             dict(type="MultiAspectRatioResizeCenterCrop", sizes=self.sizes))
         data = trans(data)
         assert "crop_top_left" in data
@@ -595,14 +586,11 @@ class TestMultiAspectRatioResizeCenterCrop(TestCase):
         lower, right = data["crop_bottom_right"]
         assert lower == upper + self.sizes[0][0]
         assert right == left + self.sizes[0][1]
-        np.equal(
-            np.array(data["img"]),
-            np.array(
-                Image.open(img_path).resize((32, 36)).crop(
-                    (left, upper, right, lower))))
+        self._assert_resize_center_crop(
+            data, "img", _open_testdata((64, 72)), self.sizes[0])
 
         # test 2nd size
-        data = {"img": Image.open(img_path).resize((55, 16))}
+        data = {"img": _open_testdata((110, 32))}
         data = trans(data)
         assert "crop_top_left" in data
         assert len(data["crop_top_left"]) == 2
@@ -612,21 +600,17 @@ class TestMultiAspectRatioResizeCenterCrop(TestCase):
         lower, right = data["crop_bottom_right"]
         assert lower == upper + self.sizes[1][0]
         assert right == left + self.sizes[1][1]
-        np.equal(
-            np.array(data["img"]),
-            np.array(
-                Image.open(img_path).resize((55, 16)).crop(
-                    (left, upper, right, lower))))
+        self._assert_resize_center_crop(
+            data, "img", _open_testdata((110, 32)), self.sizes[1])
 
     def test_transform_multiple_keys(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
         data = {
-            "img": Image.open(img_path).resize((32, 36)),
-            "condition_img": Image.open(img_path).resize((32, 36)),
+            "img": _open_testdata((64, 72)),
+            "condition_img": _open_testdata((64, 72)),
         }
 
         # test transform
-        trans = TRANSFORMS.build(
+        trans = _build(
             dict(
                 type="MultiAspectRatioResizeCenterCrop",
                 sizes=self.sizes,
@@ -640,35 +624,30 @@ class TestMultiAspectRatioResizeCenterCrop(TestCase):
         lower, right = data["crop_bottom_right"]
         assert lower == upper + self.sizes[0][0]
         assert right == left + self.sizes[0][1]
-        np.equal(
-            np.array(data["img"]),
-            np.array(
-                Image.open(img_path).resize((32, 36)).crop(
-                    (left, upper, right, lower))))
-        np.equal(np.array(data["img"]), np.array(data["condition_img"]))
+        for key in ("img", "condition_img"):
+            self._assert_resize_center_crop(
+                data, key, _open_testdata((64, 72)), self.sizes[0])
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        data = {"img": [Image.open(img_path).resize((32, 36)),
-                        Image.open(img_path).resize((55, 16))]}
+        data = {"img": [_open_testdata((32, 36)),
+                        _open_testdata((55, 16))]}
 
         # test transform
-        trans = TRANSFORMS.build(
+        trans = _build(
             dict(type="MultiAspectRatioResizeCenterCrop", sizes=self.sizes))
         with pytest.raises(
                 AssertionError, match="MultiAspectRatioResizeCenterCrop only"):
             _ = trans(data)
 
     def test_transform_multiple_keys_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
         data = {
-            "img": [Image.open(img_path).resize((32, 36)),
-                        Image.open(img_path).resize((55, 16))],
-            "condition_img": [Image.open(img_path).resize((32, 36)),
-                              Image.open(img_path).resize((55, 16))]}
+            "img": [_open_testdata((32, 36)),
+                    _open_testdata((55, 16))],
+            "condition_img": [_open_testdata((32, 36)),
+                              _open_testdata((55, 16))]}
 
         # test transform
-        trans = TRANSFORMS.build(
+        trans = _build(
             dict(type="MultiAspectRatioResizeCenterCrop", sizes=self.sizes))
         with pytest.raises(
                 AssertionError, match="MultiAspectRatioResizeCenterCrop only"):
@@ -681,26 +660,24 @@ class TestCLIPImageProcessor(TestCase):
         assert "CLIPImageProcessor" in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
         data = {
-            "img": Image.open(img_path),
+            "img": _open_testdata(),
         }
 
         # test transform
-        trans = TRANSFORMS.build(dict(type="CLIPImageProcessor"))
+        trans = _build(dict(type="CLIPImageProcessor"))
         data = trans(data)
         assert "clip_img" in data
         assert type(data["clip_img"]) == torch.Tensor
         assert data["clip_img"].size() == (3, 224, 224)
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
         data = {
-            "img": [Image.open(img_path), Image.open(img_path)],
+            "img": [_open_testdata(), _open_testdata()],
         }
 
         # test transform
-        trans = TRANSFORMS.build(dict(type="CLIPImageProcessor"))
+        trans = _build(dict(type="CLIPImageProcessor"))
         with pytest.raises(
                 AssertionError, match="CLIPImageProcessor only support"):
             _ = trans(data)
@@ -736,8 +713,7 @@ class TestComputePixArtImgInfo(TestCase):
         assert "ComputePixArtImgInfo" in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        img = Image.open(img_path)
+        img = _open_testdata()
         data = {"img": img, "ori_img_shape": [32, 32], "crop_top_left": [0, 0]}
 
         # test transform
@@ -748,8 +724,7 @@ class TestComputePixArtImgInfo(TestCase):
         assert data["aspect_ratio"] == img.height / img.width
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        img = Image.open(img_path)
+        img = _open_testdata()
         data = {
             "img": [img, img],
             "ori_img_shape": [[32, 32], [48, 48]],
@@ -799,6 +774,13 @@ class TestMaskToTensor(TestCase):
         data = trans(data)
         assert data["mask"].shape == (1, 32, 32)
 
+        # test deferred bbox mask
+        data = {"mask": dict(bbox=(2, 4, 10, 8), shape=(32, 32))}
+        data = trans(data)
+        assert data["mask"].shape == (1, 32, 32)
+        assert data["mask"].sum() == 10 * 8
+        assert torch.all(data["mask"][:, 2:12, 4:12] == 1)
+
     def test_transform_list(self):
         data = {"mask": [np.zeros((32, 32, 1))] * 2}
 
@@ -815,8 +797,7 @@ class TestGetMaskedImage(TestCase):
         assert "GetMaskedImage" in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        img = torch.Tensor(np.array(Image.open(img_path)))
+        img = torch.Tensor(np.array(_load_testdata()))
         mask = np.zeros((img.shape[0], img.shape[1], 1))
         mask[:10, :10] = 1
         mask = torch.Tensor(mask)
@@ -831,8 +812,7 @@ class TestGetMaskedImage(TestCase):
         assert data["masked_image"][:10, :10].sum() == 0
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        img = torch.Tensor(np.array(Image.open(img_path)))
+        img = torch.Tensor(np.array(_load_testdata()))
         mask = np.zeros((img.shape[0], img.shape[1], 1))
         mask[:10, :10] = 1
         mask = torch.Tensor(mask)
@@ -882,8 +862,7 @@ class TestComputeaMUSEdMicroConds(TestCase):
         assert "ComputeaMUSEdMicroConds" in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        img = Image.open(img_path)
+        img = _open_testdata()
         data = {"img": img, "ori_img_shape": [32, 32], "crop_top_left": [0, 0]}
 
         # test transform
@@ -893,8 +872,7 @@ class TestComputeaMUSEdMicroConds(TestCase):
                              [32, 32, 0, 0, 6.0])
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
-        img = Image.open(img_path)
+        img = _open_testdata()
         data = {"img": [img, img],
                 "ori_img_shape": [[32, 32], [48, 48]],
                 "crop_top_left": [[0, 0], [10, 10]]}
@@ -913,9 +891,8 @@ class TestTransformersImageProcessor(TestCase):
         assert "TransformersImageProcessor" in TRANSFORMS
 
     def test_transform(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
         data = {
-            "img": Image.open(img_path),
+            "img": _open_testdata(),
         }
 
         # test transform
@@ -927,9 +904,8 @@ class TestTransformersImageProcessor(TestCase):
         assert data["clip_img"].size() == (3, 224, 224)
 
     def test_transform_list(self):
-        img_path = osp.join(osp.dirname(__file__), "../../testdata/color.jpg")
         data = {
-            "img": [Image.open(img_path), Image.open(img_path)],
+            "img": [_open_testdata(), _open_testdata()],
         }
 
         # test transform
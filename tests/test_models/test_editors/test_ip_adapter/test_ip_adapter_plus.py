@@ -90,6 +90,7 @@ class TestIPAdapterXL(TestCase):
                 match="`finetune_text_encoder` should be False"):
             _ = MODELS.build(cfg)
 
+    @torch.inference_mode()
     def test_infer(self):
         cfg = self._get_config()
         StableDiffuser = MODELS.build(cfg)
@@ -1,3 +1,4 @@
+import unittest
 from unittest import TestCase
 
 import pytest
@@ -198,3 +199,43 @@ class TestPixArtAlpha(TestCase):
         # test test_step
         with pytest.raises(NotImplementedError, match="test_step is not"):
             StableDiffuser.test_step(torch.zeros((1, )))
+
+
+class TestPixArtAlphaDataPreprocessor(TestCase):
+
+    def test_forward(self):
+        data_preprocessor = PixArtAlphaDataPreprocessor()
+
+        data = dict(inputs=dict(
+            img=[torch.zeros((3, 8, 8))] * 2, text=["a", "b"],
+            resolution=[torch.zeros(2)] * 2, aspect_ratio=[torch.zeros(1)] * 2))
+        data = data_preprocessor(data)
+        assert data["inputs"]["img"].shape == (2, 3, 8, 8)
+        assert data["inputs"]["resolution"].shape == (2, 2)
+        assert data["inputs"]["aspect_ratio"].shape == (2, 1)
+
+        # test already collated batch
+        img = torch.zeros((2, 3, 8, 8))
+        data = dict(inputs=dict(img=img, text=["a", "b"]))
+        data = data_preprocessor(data)
+        assert data["inputs"]["img"] is img
+
+    @unittest.skipIf(not torch.cuda.is_available(), "CUDA is not available")
+    def test_forward_pin_memory(self):
+        pinned = PixArtAlphaDataPreprocessor().cuda()
+        unpinned = PixArtAlphaDataPreprocessor(pin_memory=False).cuda()
+
+        # the second batch reuses the buffer, the larger third batch falls
+        # back to pinning on the fly and the last one is already collated
+        batches = [[torch.rand((3, 8, 8)) for _ in range(n)]
+                   for n in (2, 2, 3)] + [torch.rand((2, 3, 8, 8))]
+        outputs = []
+        for img in batches:
+            expected = unpinned(dict(inputs=dict(img=img)))["inputs"]["img"]
+            out = pinned(dict(inputs=dict(img=img)))["inputs"]["img"]
+            assert out.is_cuda
+            outputs.append((out, expected))
+        torch.cuda.synchronize()
+        # earlier outputs are not overwritten by the reused buffer
+        for out, expected in outputs:
+            assert torch.equal(out, expected)
@@ -85,10 +85,12 @@ class TestSSD1B(TestCase):
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
             negative_prompt="noise",
+            output_type="latent",
             height=64,
             width=64)
         assert len(result) == 1
-        assert result[0].shape == (64, 64, 3)
+        assert type(result[0]) == torch.Tensor
+        assert result[0].shape == (4, 32, 32)
 
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
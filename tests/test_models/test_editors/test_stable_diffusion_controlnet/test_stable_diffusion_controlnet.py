@@ -5,6 +5,7 @@ import torch
 from diffusers import AutoencoderKL, DDPMScheduler, UNet2DConditionModel
 from diffusers.models.unets.unet_2d_blocks import CrossAttnDownBlock2D, DownBlock2D
 from mmengine.optim import OptimWrapper
+from testing_utils import load_resized
 from torch.optim import SGD
 from transformers import CLIPTextModel, CLIPTokenizer
 
@@ -65,11 +66,11 @@ class TestStableDiffusionControlNet(TestCase):
 
     def test_infer(self):
         cfg = self._get_config()
-        StableDiffuser =  MODELS.build(cfg)
+        StableDiffuser = MODELS.build(cfg)
         assert isinstance(StableDiffuser.controlnet.down_blocks[1],
                           CrossAttnDownBlock2D)
 
-        # test infer
+        # test infer with the full size image loaded from its path
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
             ["tests/testdata/color.jpg"],
@@ -84,7 +85,7 @@ class TestStableDiffusionControlNet(TestCase):
         # test infer with negative_prompt
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
-            ["tests/testdata/color.jpg"],
+            [load_resized("tests/testdata/color.jpg", (64, 64))],
             negative_prompt="noise",
             height=64,
             width=64)
@@ -93,7 +94,7 @@ class TestStableDiffusionControlNet(TestCase):
 
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
-            ["tests/testdata/color.jpg"],
+            [load_resized("tests/testdata/color.jpg", (64, 64))],
             output_type="latent",
             height=64,
             width=64)
@@ -110,7 +111,7 @@ class TestStableDiffusionControlNet(TestCase):
 
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
-            ["tests/testdata/color.jpg"],
+            [load_resized("tests/testdata/color.jpg", (64, 64))],
             height=64,
             width=64)
         assert len(result) == 1
@@ -172,7 +173,7 @@ class TestStableDiffusionControlNet(TestCase):
 
     def test_val_and_test_step(self):
         cfg = self._get_config()
-        StableDiffuser =  MODELS.build(cfg)
+        StableDiffuser = MODELS.build(cfg)
 
         # test val_step
         with pytest.raises(NotImplementedError, match="val_step is not"):
@@ -80,10 +80,12 @@ class TestStableDiffusionXL(TestCase):
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
             negative_prompt="noise",
+            output_type="latent",
             height=64,
             width=64)
         assert len(result) == 1
-        assert result[0].shape == (64, 64, 3)
+        assert type(result[0]) == torch.Tensor
+        assert result[0].shape == (4, 32, 32)
 
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
@@ -338,3 +340,21 @@ class TestStableDiffusionXL(TestCase):
         # test test_step
         with pytest.raises(NotImplementedError, match="test_step is not"):
             StableDiffuser.test_step(torch.zeros((1, )))
+
+
+class TestSDXLDataPreprocessor(TestCase):
+
+    def test_forward_compute_time_ids(self):
+        data_preprocessor = SDXLDataPreprocessor()
+
+        data = dict(inputs=dict(
+            img=[torch.zeros((3, 8, 6))] * 2, text=["a", "b"],
+            ori_img_shape=[torch.tensor([16, 12]), torch.tensor([20, 10])],
+            crop_top_left=[torch.tensor([1, 2]), torch.tensor([3, 4])]))
+        data = data_preprocessor(data)
+        assert data["inputs"]["img"].shape == (2, 3, 8, 6)
+        assert "ori_img_shape" not in data["inputs"]
+        assert "crop_top_left" not in data["inputs"]
+        assert torch.equal(
+            data["inputs"]["time_ids"],
+            torch.tensor([[16, 12, 1, 2, 8, 6], [20, 10, 3, 4, 8, 6]]))
@@ -5,6 +5,7 @@ import torch
 from diffusers import AutoencoderKL, DDPMScheduler, UNet2DConditionModel
 from diffusers.models.unets.unet_2d_blocks import CrossAttnDownBlock2D, DownBlock2D
 from mmengine.optim import OptimWrapper
+from testing_utils import load_resized
 from torch.optim import SGD
 from transformers import AutoTokenizer, CLIPTextModel, CLIPTextModelWithProjection
 
@@ -76,7 +77,7 @@ class TestStableDiffusionXLControlNet(TestCase):
         assert isinstance(StableDiffuser.controlnet.down_blocks[1],
                           CrossAttnDownBlock2D)
 
-        # test infer
+        # test infer with the full size image loaded from its path
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
             ["tests/testdata/color.jpg"],
@@ -91,7 +92,7 @@ class TestStableDiffusionXLControlNet(TestCase):
         # test infer with negative_prompt
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
-            ["tests/testdata/color.jpg"],
+            [load_resized("tests/testdata/color.jpg", (64, 64))],
             negative_prompt="noise",
             height=64,
             width=64)
@@ -100,7 +101,7 @@ class TestStableDiffusionXLControlNet(TestCase):
 
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
-            ["tests/testdata/color.jpg"],
+            [load_resized("tests/testdata/color.jpg", (64, 64))],
             output_type="latent",
             height=64,
             width=64)
@@ -117,7 +118,7 @@ class TestStableDiffusionXLControlNet(TestCase):
 
         result = StableDiffuser.infer(
             ["an insect robot preparing a delicious meal"],
-            ["tests/testdata/color.jpg"],
+            [load_resized("tests/testdata/color.jpg", (64, 64))],
             height=64,
             width=64)
         assert len(result) == 1
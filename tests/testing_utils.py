@@ -0,0 +1,23 @@
+import functools
+
+from diffusers.utils import load_image
+from PIL import Image
+
+
+@functools.lru_cache(maxsize=8)
+def _load_resized(path: str, size: tuple[int, int]) -> Image.Image:
+    with Image.open(path) as img:
+        # let libjpeg decode at a reduced scale that still covers ``size``
+        img.draft("RGB", size)
+        img.load()
+        # the resized copy is detached from the file, which is closed here
+        return load_image(img).resize(size)
+
+
+def load_resized(path: str, size: tuple[int, int]) -> Image.Image:
+    """Load and resize a test image once for all the tests using it.
+
+    Each caller gets its own copy, so that a test changing the image in
+    place does not affect the others.
+    """
+    return _load_resized(path, size).copy()